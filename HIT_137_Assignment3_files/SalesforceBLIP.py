@@ -1,4 +1,5 @@
-# Use a pipeline as a high-level helper
-from transformers import pipeline
+# Use a pipeline as a high-level helper (loaded once, on first use, through the shared registry)
+from pipeline_registry import get_registry, BLIP_MODEL
 
-pipe = pipeline("image-to-text", model="Salesforce/blip-image-captioning-base")
\ No newline at end of file
+def get_pipe():  # Returns the BLIP captioning pipeline without reloading it on every call
+    return get_registry().get(*BLIP_MODEL)
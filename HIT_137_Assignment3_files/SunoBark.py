@@ -1,4 +1,5 @@
-# Use a pipeline as a high-level helper
-from transformers import pipeline
+# Use a pipeline as a high-level helper (loaded once, on first use, through the shared registry)
+from pipeline_registry import get_registry, BARK_MODEL
 
-pipe = pipeline("text-to-speech", model="suno/bark")
\ No newline at end of file
+def get_pipe():  # Returns the Bark text-to-speech pipeline without reloading it on every call
+    return get_registry().get(*BARK_MODEL)
@@ -0,0 +1,173 @@
+# audio_sinks.py — Where synthesized speech goes: a WAV in memory, a WAV file, the speakers, or nowhere
+
+import atexit  # Removes temporary WAV files when the program exits
+import io  # In-memory WAV buffers
+import os  # Removes files
+import queue  # Hands audio to the background player thread
+import shutil  # Looks for a command-line audio player
+import subprocess  # Runs the command-line audio player
+import sys  # Detects Windows for winsound playback
+import tempfile  # Temporary WAV files
+import threading  # Plays audio without blocking the caller
+import wave  # Writes WAV headers (standard library, no SciPy needed)
+from abc import ABC, abstractmethod  # An incomplete sink fails when it is created, not on its first chunk
+import numpy as np  # Audio arrays
+
+
+def to_int16_pcm(audio):  # Converts Bark's float audio (-1..1) to 16-bit PCM samples, once
+    audio = np.asarray(audio)
+    if audio.dtype == np.int16:  # Already PCM
+        return audio.reshape(-1)
+    return (np.clip(audio.astype(np.float32).reshape(-1), -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def wav_bytes(pcm, sample_rate):  # Wraps 16-bit mono PCM bytes in a WAV header, in memory
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)  # Mono
+        wav.setsampwidth(2)  # 16-bit samples
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def play_wav_bytes(data):  # Plays WAV data and waits until it has finished; False if no player is available
+    if sys.platform == "win32":
+        import winsound  # Built into Python on Windows
+        winsound.PlaySound(data, winsound.SND_MEMORY)  # Blocks until playback ends
+        return True
+    for command in (["aplay", "-q", "-"], ["paplay"]):  # Linux players that read WAV from stdin
+        if shutil.which(command[0]):
+            subprocess.run(command, input=data, check=False)
+            return True
+    if shutil.which("afplay"):  # macOS player needs a file
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
+            tmp.write(data)
+        try:
+            subprocess.run(["afplay", tmp.name], check=False)
+        finally:
+            os.remove(tmp.name)  # Never leave the temporary file behind
+        return True
+    return False
+
+
+class AudioSink(ABC):  # Base class: receives audio chunk by chunk, then close() once
+    def __init__(self):
+        self.frames = 0  # Samples received so far
+        self.sample_rate = None  # Rate of the audio received
+
+    def write(self, audio, sample_rate):  # Accepts one chunk of Bark output (float or int16 samples)
+        pcm = to_int16_pcm(audio)  # Converted once, here, for every backend
+        self.frames += len(pcm)
+        self.sample_rate = sample_rate
+        self.write_pcm(pcm.tobytes(), sample_rate)
+
+    @abstractmethod
+    def write_pcm(self, pcm, sample_rate):  # Backends handle 16-bit mono PCM bytes
+        pass
+
+    def close(self):  # Finishes the output
+        pass
+
+    @property
+    def duration(self):  # Seconds of audio received
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class NullSink(AudioSink):  # Discards audio (headless runs and benchmarks); still counts frames
+    def write_pcm(self, pcm, sample_rate):
+        pass
+
+
+class _WaveSink(AudioSink):  # Appends chunks to one growing WAV; wave updates the header after every write
+    def __init__(self, target):
+        super().__init__()
+        self._target = target  # File path or file object
+        self._wav = None  # Opened with the first chunk, when the sample rate is known
+
+    def write_pcm(self, pcm, sample_rate):
+        if self._wav is None:
+            self._wav = wave.open(self._target, "wb")
+            self._wav.setnchannels(1)  # Mono
+            self._wav.setsampwidth(2)  # 16-bit samples
+            self._wav.setframerate(sample_rate)
+        self._wav.writeframes(pcm)
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+
+class MemoryWavSink(_WaveSink):  # Builds the WAV in memory: no temporary file at all
+    def __init__(self):
+        self.buffer = io.BytesIO()
+        super().__init__(self.buffer)
+
+    def getvalue(self):  # The complete WAV file as bytes
+        return self.buffer.getvalue()
+
+
+class FileWavSink(_WaveSink):  # Writes a WAV file; temporary files are removed again
+    def __init__(self, path=None, delete=None):
+        if path is None:  # No path given: use a temporary file, deleted by default
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
+                path = tmp.name
+            delete = True if delete is None else delete
+        self.path = path  # Where the WAV is written
+        self.delete = bool(delete)  # Remove the file on cleanup()
+        if self.delete:
+            atexit.register(self.cleanup)  # Still removed if the caller never cleans up
+        super().__init__(path)
+
+    def cleanup(self):  # Closes and removes the file if it is temporary
+        self.close()
+        if self.delete and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __exit__(self, *exc):
+        self.cleanup()
+
+
+_playback_lock = threading.Lock()  # One sound at a time, even across several players
+
+
+class AsyncPlayerSink(AudioSink):  # Plays each chunk on a background thread; write() returns immediately
+    def __init__(self, player=play_wav_bytes):
+        super().__init__()
+        self.player = player  # play(wav_bytes) -> False when no audio player is available
+        self.errors = []  # Playback failures, also printed to the console
+        self._queue = queue.Queue()  # WAV chunks waiting to be played
+        self._thread = threading.Thread(target=self._play_all, name="audio-player", daemon=True)
+        self._thread.start()
+
+    def write_pcm(self, pcm, sample_rate):
+        self._queue.put(wav_bytes(pcm, sample_rate))  # Played in order after the current chunk
+
+    def close(self):  # Returns at once; queued audio keeps playing in the background
+        self._queue.put(None)
+
+    def join(self, timeout=None):  # Waits until everything queued has been played
+        self._thread.join(timeout)
+
+    def _play_all(self):
+        warned = False
+        while True:
+            data = self._queue.get()
+            if data is None:  # close() was called
+                return
+            try:
+                with _playback_lock:
+                    played = self.player(data)
+                if not played and not warned:
+                    print("No audio player found (winsound, aplay, paplay or afplay); audio was not played.")
+                    warned = True
+            except Exception as e:  # Keep going with the next chunk
+                self.errors.append(e)
+                print(f"Audio playback failed: {e}")
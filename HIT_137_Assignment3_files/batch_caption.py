@@ -0,0 +1,170 @@
+# batch_caption.py — Captions every image in a folder with BLIP from the command line
+#
+#   python batch_caption.py photos/ captions.jsonl --batch-size 16
+#
+# Images are decoded and resized on a thread pool while the model captions the previous batch.
+# Results are appended after every batch, so an interrupted run picks up where it stopped.
+
+import argparse  # Reads command-line options
+import csv  # Writes and reads .csv output
+import json  # Writes and reads .jsonl output
+import os  # Walks the image folder
+import sys  # Progress messages go to stderr
+import time  # Measures throughput
+from collections import deque  # Queue of images being decoded ahead of the model
+from concurrent.futures import ThreadPoolExecutor  # Decodes images in parallel with inference
+from PIL import Image  # Opens and resizes images
+from model_runner import ModelRunner  # Runs the shared BLIP pipeline
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp", ".tif", ".tiff"}  # Files treated as images
+FIELDS = ["path", "caption", "error"]  # Columns of the output
+
+
+def iter_image_paths(folder, recursive=False):  # Yields image paths relative to folder, in a stable order
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()  # Visits subfolders alphabetically
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                yield os.path.relpath(os.path.join(root, name), folder)
+        if not recursive:  # Only the top folder unless asked otherwise
+            break
+
+
+def load_done(output_path):  # Paths already written to the output by an earlier run
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, newline="", encoding="utf-8") as f:
+        if output_path.lower().endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = []
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:  # A line cut short when the previous run was interrupted
+                    pass
+        for row in rows:
+            if row.get("path") and all(row.get(field) is not None for field in FIELDS):  # Complete rows only
+                done.add(row["path"])
+    return done
+
+
+def trim_partial_row(output_path, is_csv):  # Drops a last row cut short by an interrupted run
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        end = len(data)
+        while end:  # Back up to a newline that ends a whole row (not one inside a quoted CSV field)
+            if data.endswith(b"\n", 0, end) and not (is_csv and data.count(b'"', 0, end) % 2):
+                break
+            end = data.rfind(b"\n", 0, end - 1) + 1  # 0 when there is no earlier newline
+        if end < len(data):
+            f.truncate(end)
+            print(f"Dropped an incomplete last row from {output_path}", file=sys.stderr)
+
+
+def load_image(path, max_size):  # Decodes one image (runs on a worker thread)
+    image = Image.open(path)
+    if max_size:
+        image.draft("RGB", (max_size, max_size))  # Lets JPEG decode straight to a reduced size
+    image = image.convert("RGB")  # BLIP expects three colour channels
+    if max_size:
+        image.thumbnail((max_size, max_size))  # The model resizes to 384px anyway; smaller input is faster
+    return image
+
+
+def decoded_batches(folder, paths, batch_size, pool, max_size):  # Yields batches of (path, image or error)
+    pending = deque()  # (path, future) for images being decoded ahead of the model
+    paths = iter(paths)
+
+    def fill():  # Keeps two batches of decoding in flight
+        while len(pending) < 2 * batch_size:
+            path = next(paths, None)
+            if path is None:
+                return
+            pending.append((path, pool.submit(load_image, os.path.join(folder, path), max_size)))
+
+    fill()
+    batch = []
+    while pending:
+        path, future = pending.popleft()
+        fill()  # Starts decoding the next image before waiting for this one
+        try:
+            batch.append((path, future.result()))
+        except Exception as e:  # Unreadable file: recorded as an error instead of stopping the run
+            batch.append((path, e))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class OutputWriter:  # Appends result rows as JSON lines or CSV
+    def __init__(self, output_path):
+        self.is_csv = output_path.lower().endswith(".csv")
+        if os.path.exists(output_path):
+            trim_partial_row(output_path, self.is_csv)  # Otherwise the next row is glued onto the partial one
+        new_file = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+        self.file = open(output_path, "a", newline="", encoding="utf-8")
+        if self.is_csv:
+            self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+            if new_file:
+                self.writer.writeheader()
+
+    def write(self, rows):  # Writes one batch and flushes it to disk
+        for row in rows:
+            if self.is_csv:
+                self.writer.writerow(row)
+            else:
+                self.file.write(json.dumps(row) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def caption_folder(folder, output_path, batch_size=8, workers=4, max_size=768, recursive=False, runner=None):
+    runner = runner or ModelRunner()  # Uses the shared pipeline registry
+    done = load_done(output_path)  # Resume: skip images captioned by an earlier run
+    paths = (path for path in iter_image_paths(folder, recursive) if path not in done)
+    if done:
+        print(f"Skipping {len(done)} images already in {output_path}", file=sys.stderr)
+
+    writer = OutputWriter(output_path)
+    count = 0
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for batch in decoded_batches(folder, paths, batch_size, pool, max_size):
+                loaded = [(path, image) for path, image in batch if not isinstance(image, Exception)]
+                captions = runner.run_image_captioning_batch([image for _, image in loaded], batch_size) if loaded else []
+                rows = [{"path": path, "caption": caption, "error": ""} for (path, _), caption in zip(loaded, captions)]
+                rows += [{"path": path, "caption": "", "error": str(image)} for path, image in batch
+                         if isinstance(image, Exception)]
+                writer.write(rows)
+                count += len(batch)
+                elapsed = time.perf_counter() - start
+                print(f"{count} images, {count / elapsed:.2f} images/sec", file=sys.stderr)
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else 0.0
+    print(f"Captioned {count} images in {elapsed:.1f}s ({rate:.2f} images/sec)", file=sys.stderr)
+    return count, rate
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Caption every image in a folder with BLIP.")
+    parser.add_argument("folder", help="folder of images")
+    parser.add_argument("output", help="results file (.jsonl or .csv); existing results are skipped")
+    parser.add_argument("--batch-size", type=int, default=8, help="images per model call (default: 8)")
+    parser.add_argument("--workers", type=int, default=4, help="threads decoding images (default: 4)")
+    parser.add_argument("--max-size", type=int, default=768, help="longest side after resizing, 0 to keep (default: 768)")
+    parser.add_argument("--recursive", action="store_true", help="include images in subfolders")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":  # Runs script directly
+    args = parse_args()
+    caption_folder(args.folder, args.output, args.batch_size, args.workers, args.max_size, args.recursive)
@@ -0,0 +1,113 @@
+# benchmark_inference.py — Compares CPU inference profiles on BLIP captioning
+#
+#   python benchmark_inference.py photos/ --profiles default fast int8 bf16 --images 20 --json results.json
+#
+# Each profile runs in a fresh process (torch thread settings are process-wide and peak memory is per
+# process). Reports model load time, per-image latency, batched throughput, peak memory and how close
+# each profile's captions are to the default profile's.
+
+import argparse  # Reads command-line options
+import difflib  # Word-level caption similarity
+import json  # Saves the results
+import multiprocessing  # Fresh process per profile
+import os  # Joins image paths
+import statistics  # Latency percentiles
+import sys  # Platform check for peak memory units
+import time  # Timing
+from concurrent.futures import ProcessPoolExecutor  # Runs one profile in a child process
+from batch_caption import iter_image_paths, load_image  # Same image loading as the batch CLI
+from inference_profile import PROFILES, get_profile  # CPU inference presets
+
+
+def _peak_rss_mb():  # Peak resident memory of this process in MB, or None where unsupported
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # Bytes on macOS, KB on Linux
+
+
+def caption_similarity(caption, reference):  # 1.0 for identical word sequences, 0.0 for nothing in common
+    return difflib.SequenceMatcher(None, caption.lower().split(), reference.lower().split()).ratio()
+
+
+def _run_profile(name, folder, paths, threads, interop_threads, batch_size, max_size):  # Runs in a child process
+    from model_runner import ModelRunner  # Imported here so torch starts fresh in every process
+    from pipeline_registry import PipelineRegistry, BLIP_MODEL
+    images = [load_image(os.path.join(folder, path), max_size) for path in paths]  # Decoding is not timed
+
+    runner = ModelRunner()
+    if name == "default":  # The baseline keeps torch's own thread settings
+        threads = interop_threads = None
+    runner.registry = PipelineRegistry(profile=get_profile(name, threads, interop_threads))  # Bypasses the result cache
+    start = time.perf_counter()
+    runner.get_pipeline(BLIP_MODEL)  # Load (and quantize) the model
+    load_seconds = time.perf_counter() - start
+    runner.run_image_captioning_batch(images[:1], 1)  # Warm-up call, not timed
+
+    captions, latencies = [], []
+    for image in images:  # One image at a time: what a GUI click costs
+        start = time.perf_counter()
+        captions += runner.run_image_captioning_batch([image], 1)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    runner.run_image_captioning_batch(images, batch_size)  # Batched: what the batch CLI gets
+    batch_seconds = time.perf_counter() - start
+    return {"profile": name, "load_seconds": load_seconds, "latencies": latencies,
+            "images_per_second": len(images) / batch_seconds, "peak_rss_mb": _peak_rss_mb(), "captions": captions}
+
+
+def run_benchmark(folder, profiles, images=20, threads=None, interop_threads=None, batch_size=8, max_size=768):
+    paths = []
+    for path in iter_image_paths(folder):  # The first `images` images of the folder
+        paths.append(path)
+        if len(paths) == images:
+            break
+    if not paths:
+        raise SystemExit(f"No images found in {folder}")
+    profiles = ["default"] + [name for name in profiles if name != "default"]  # Default is the quality reference
+
+    context = multiprocessing.get_context("spawn")
+    results = []
+    print(f"{'profile':>8}{'load s':>9}{'p50 ms':>9}{'p90 ms':>9}{'img/s':>8}{'peak MB':>9}{'similar':>9}{'exact':>7}")
+    for name in profiles:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(_run_profile, name, folder, paths, threads, interop_threads,
+                                 batch_size, max_size).result()
+        reference = results[0]["captions"] if results else result["captions"]
+        scores = [caption_similarity(caption, ref) for caption, ref in zip(result["captions"], reference)]
+        latencies = sorted(result["latencies"])
+        result.update(paths=paths,
+                      p50_ms=statistics.median(latencies) * 1000,
+                      p90_ms=latencies[min(len(latencies) - 1, int(0.9 * len(latencies)))] * 1000,
+                      similarity=statistics.mean(scores),
+                      exact_match=sum(score == 1.0 for score in scores) / len(scores))
+        results.append(result)
+        peak = f"{result['peak_rss_mb']:.0f}" if result["peak_rss_mb"] is not None else "n/a"
+        print(f"{name:>8}{result['load_seconds']:>9.1f}{result['p50_ms']:>9.0f}{result['p90_ms']:>9.0f}"
+              f"{result['images_per_second']:>8.2f}{peak:>9}{result['similarity']:>9.3f}{result['exact_match']:>7.0%}")
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CPU inference profiles on BLIP image captioning.")
+    parser.add_argument("folder", help="folder of test images")
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    parser.add_argument("--images", type=int, default=20, help="number of images to caption (default: 20)")
+    parser.add_argument("--threads", type=int, help="torch intra-op threads for the tuned profiles")
+    parser.add_argument("--interop-threads", type=int, help="torch inter-op threads for the tuned profiles")
+    parser.add_argument("--batch-size", type=int, default=8, help="batch size for the throughput run (default: 8)")
+    parser.add_argument("--max-size", type=int, default=768, help="longest image side after resizing (default: 768)")
+    parser.add_argument("--json", metavar="PATH", help="also save the results, including every caption, as JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":  # Runs script directly
+    args = parse_args()
+    results = run_benchmark(args.folder, args.profiles, args.images, args.threads, args.interop_threads,
+                            args.batch_size, args.max_size)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
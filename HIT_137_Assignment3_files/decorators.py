@@ -1,17 +1,24 @@
 # This file adds logging and error handling
 
+import functools  # Keeps the original function's name and docstring on the wrapper
 from tkinter import messagebox  # For showing errors in the GUI displayed in a msg box
+from metrics import metrics  # In-process registry that instrument() records into
 
 def log_action(func):  # Decorator to log when a function is called
+    @functools.wraps(func)  # Lets decorators stack without hiding the function's name
     def wrapper(*args, **kwargs):  # Inner wrapper function that intercepts the call
         print(f"Running: {func.__name__}")  # Log the function name to console
         return func(*args, **kwargs)  # Call the original function with its arguments
     return wrapper  # Return the wrapped function to replace the original
 
 def handle_errors(func):  # Decorator to catch and display runtime errors
+    @functools.wraps(func)  # Lets decorators stack without hiding the function's name
     def wrapper(*args, **kwargs):  # Inner wrapper function
         try:
             return func(*args, **kwargs)  # Try running the original function
         except Exception as e:  # Catch any exception that occurs
             messagebox.showerror("Error", str(e))  # Show error message in a popup
-    return wrapper  # Return the wrapped function to replace the original                        
\ No newline at end of file
+    return wrapper  # Return the wrapped function to replace the original
+
+def instrument(func):  # Decorator to record wall/CPU time, peak memory and call counts (when metrics are on)
+    return metrics.timed(func.__qualname__, func)  # Near-zero overhead while metrics are off
@@ -1,12 +1,54 @@
+import queue  # Thread-safe queues between the GUI thread and the model worker
+import threading  # Runs model inference off the GUI thread
 import tkinter as tk  # Core GUI toolkit for building desktop applications
+from concurrent.futures import Future  # Result, exception and cancellation state of one job
 from tkinter import filedialog, messagebox, ttk  # Additional widgets and dialogs for user interaction
 from PIL import Image  # Used to load and process image files for captioning
 from decorators import log_action, handle_errors  # Custom decorators for logging and error handling
 from model_runner import ModelRunner  # Class that runs AI models (BLIP and Bark)
+from pipeline_registry import get_registry  # Shared registry used to preload models
 from oop_explainer import get_oop_explanation, get_model_info  # Functions to display OOP concepts and model metadata
 
+
+class ModelWorker:  # One daemon thread running jobs in order; unlike a ThreadPoolExecutor it never delays exit
+    def __init__(self, name="model"):
+        self.jobs = queue.Queue()  # (future, func, args) waiting to run; None stops the thread
+        self.thread = threading.Thread(target=self.run, name=name, daemon=True)  # Daemon: not joined at exit
+        self.thread.start()
+
+    def submit(self, func, *args):  # Queues func(*args) and returns its Future
+        future = Future()
+        self.jobs.put((future, func, args))
+        return future
+
+    def run(self):  # Worker thread loop
+        while True:
+            job = self.jobs.get()
+            if job is None:  # Shut down
+                return
+            future, func, args = job
+            if not future.set_running_or_notify_cancel():  # Cancelled while waiting
+                continue
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:  # Re-raised on the GUI thread by future.result()
+                future.set_exception(e)
+
+    def shutdown(self):  # Cancels waiting jobs and stops the thread after the running job
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job[0].cancel()
+        self.jobs.put(None)
+
+
 class AIModelGUI(tk.Tk, ModelRunner):  # Inherits from Tkinter's main window and model logic class
-    def __init__(self):  # Constructor method to initialize the GUI
+    POLL_MS = 100  # How often (ms) the GUI checks the results queue
+
+    def __init__(self, warm_up=False):  # Constructor method to initialize the GUI
         super().__init__()  # Calls parent constructors (Tk and ModelRunner)
         self.title("HIT137 AI Model Display")  # Sets the window title
         self.geometry("800x700")  # Defines the window size in pixels
@@ -18,7 +60,16 @@ class AIModelGUI(tk.Tk, ModelRunner):  # Inherits from Tkinter's main window and
         self.caption_output_box = None  # Will hold the output widget for image captions
         self.model_info = None  # Will hold the label displaying model metadata
 
+        self.worker = ModelWorker()  # One model run at a time; others wait in line
+        self.results = queue.Queue()  # Finished jobs come back here from the worker thread
+        self.jobs = {}  # Job name -> future for every queued or running job
+
         self.create_widgets()  # Builds all GUI components by calling setup methods
+        self.protocol("WM_DELETE_WINDOW", self.on_close)  # Stops the worker cleanly when the window closes
+        self.after(self.POLL_MS, self.poll_results)  # Starts checking for finished jobs
+
+        if warm_up:  # Optionally load both models in the background while the window opens
+            (self.registry or get_registry()).warm_up()
 
     def create_widgets(self):  # Organizes GUI component creation into modular methods
         self.create_model_selection()  # Adds dropdown for selecting model type
@@ -48,6 +99,12 @@ class AIModelGUI(tk.Tk, ModelRunner):  # Inherits from Tkinter's main window and
         ttk.Button(frame, text="Run Image-to-Text Model", command=self.run_model_1).grid(row=0, column=0)  # Button to run BLIP
         ttk.Button(frame, text="Run Text-to-Speech Model", command=self.run_model_2).grid(row=0, column=1)  # Button to run Bark
         ttk.Button(frame, text="Clear", command=self.clear_output).grid(row=0, column=2)  # Button to clear output and reset
+        ttk.Button(frame, text="Cancel", command=self.cancel_jobs).grid(row=0, column=3)  # Button to cancel jobs still waiting to run
+
+        self.progress = ttk.Progressbar(self, mode="indeterminate", length=300)  # Busy indicator while a model runs
+        self.progress.pack(pady=5)  # Adds the progress bar below the buttons
+        self.status = ttk.Label(self, text="Ready")  # Shows which jobs are running or queued
+        self.status.pack()  # Adds the status line to the GUI
 
     def create_output_section(self):  # Creates separate input/output boxes for TTS and captioning
         ttk.Label(self, text="Text Input (for TTS)", font=("Arial",10)).pack(pady=10)  # Label for TTS input box
@@ -82,34 +139,80 @@ class AIModelGUI(tk.Tk, ModelRunner):  # Inherits from Tkinter's main window and
     def browse_file(self):  # Opens file dialog to select an image
         self.file_path = filedialog.askopenfilename()  # Stores selected file path for captioning
 
+    def submit_job(self, name, func, *args, on_done):  # Runs func(*args) on the worker thread
+        if name in self.jobs:  # Double click: this job is already queued or running
+            return None
+        future = self.worker.submit(func, *args)  # Queues the model call for the worker thread
+        future.add_done_callback(lambda f: self.results.put((name, f, on_done)))  # Hands the result back via the queue
+        self.jobs[name] = future  # Remembers the job so it can be cancelled
+        self.update_busy()  # Shows the progress bar
+        return future
+
+    def poll_results(self):  # Called on the GUI thread every POLL_MS to deliver finished jobs
+        try:
+            while True:
+                name, future, on_done = self.results.get_nowait()  # Next finished (or cancelled) job
+                self.jobs.pop(name, None)  # The job is no longer in flight
+                if not future.cancelled():  # Cancelled jobs have no result to show
+                    self.finish_job(future, on_done)
+        except queue.Empty:  # Nothing more to deliver for now
+            pass
+        self.update_busy()  # Refreshes the progress bar and status line
+        self.after(self.POLL_MS, self.poll_results)  # Checks again shortly
+
+    @handle_errors  # Worker exceptions are re-raised here and shown in a messagebox
+    def finish_job(self, future, on_done):  # Passes a finished job's result to its handler
+        on_done(future.result())  # future.result() re-raises any exception from the worker
+
+    def update_busy(self):  # Starts or stops the progress bar to match the jobs in flight
+        if self.jobs:  # At least one job queued or running
+            self.status.config(text="Working: " + ", ".join(self.jobs))  # Lists the jobs in flight
+            self.progress.start(10)  # Animates the busy indicator
+        else:
+            self.status.config(text="Ready")  # Nothing running
+            self.progress.stop()  # Stops the busy indicator
+
+    def cancel_jobs(self):  # Cancels jobs still waiting for the worker
+        cancelled = [name for name, future in self.jobs.items() if future.cancel()]  # A running job can't be stopped
+        if self.jobs and not cancelled:  # Only the running job is left
+            messagebox.showinfo("Cancel", "The running model can't be stopped; it will finish shortly.")  # Explains why nothing changed
+
+    def on_close(self):  # Ends the app when the window is closed, even in the middle of a model run
+        self.worker.shutdown()  # Drops queued jobs; a running one is abandoned with its daemon thread at exit
+        self.destroy()  # Closes the window
+
     @log_action  # Logs method call to console
     @handle_errors  # Catches and displays errors in a messagebox
     def run_model_1(self):  # Runs BLIP image captioning model
         if self.input_type.get() == "Image" and self.file_path:  # Checks if input type is Image and file is selected
-            caption = self.run_image_captioning(self.file_path)  # Runs BLIP model and gets caption
-            self.caption_output_box.config(state="normal")  # Enables caption box for writing
-            self.caption_output_box.delete("1.0", tk.END)  # Clears previous output
-            self.caption_output_box.insert(tk.END, f"Caption: {caption}\n")  # Inserts new caption
-            self.caption_output_box.config(state="disabled")  # Locks caption box to prevent editing
-            info = get_model_info("Salesforce/blip-image-captioning-base", "Vision", "BLIP image captioning model.")  # Gets model metadata
-            self.model_info.config(text=info)  # Displays model info
+            self.submit_job("Image-to-Text", self.run_image_captioning, self.file_path, on_done=self.show_caption)  # Runs BLIP on the worker thread
         else:
             messagebox.showinfo("More information needed", "Please select an image file.")  # Prompts user to select image
 
+    def show_caption(self, caption):  # Displays a finished caption (runs on the GUI thread)
+        self.caption_output_box.config(state="normal")  # Enables caption box for writing
+        self.caption_output_box.delete("1.0", tk.END)  # Clears previous output
+        self.caption_output_box.insert(tk.END, f"Caption: {caption}\n")  # Inserts new caption
+        self.caption_output_box.config(state="disabled")  # Locks caption box to prevent editing
+        info = get_model_info("Salesforce/blip-image-captioning-base", "Vision", "BLIP image captioning model.")  # Gets model metadata
+        self.model_info.config(text=info)  # Displays model info
+
     @log_action  # Logs method call to console
     @handle_errors  # Catches and displays errors in a messagebox
     def run_model_2(self):  # Runs Bark text-to-speech model
         if self.input_type.get() == "Text":  # Checks if input type is Text
             text = self.text_input_box.get("1.0", tk.END).strip()  # Retrieves and trims user input
             if text:  # Checks if input is not empty
-                self.run_text_to_speech(text)  # Runs Bark model and plays audio
-                info = get_model_info("suno/bark", "Audio", "Neural text-to-speech model.")  # Gets model metadata
-                self.model_info.config(text=info)  # Displays model info
+                self.submit_job("Text-to-Speech", self.run_text_to_speech, text, on_done=self.show_speech_done)  # Runs Bark on the worker thread
             else:
                 messagebox.showinfo("More information needed", "Please enter text to speak.")  # Prompts user to enter text
         else:
             messagebox.showinfo("More information needed", "Text input required for TTS.")  # Warns user if wrong input type
 
+    def show_speech_done(self, _):  # Updates the GUI once speech has been generated and played
+        info = get_model_info("suno/bark", "Audio", "Neural text-to-speech model.")  # Gets model metadata
+        self.model_info.config(text=info)  # Displays model info
+
     def clear_output(self):  # Clears all user input and output
         self.text_input_box.delete("1.0", tk.END)  # Clears text input box
         self.caption_output_box.config(state="normal")  # Enables caption box for clearing
@@ -0,0 +1,110 @@
+# inference_profile.py — CPU tuning applied to each pipeline after it loads: int8 quantization, threads, bf16
+#
+# Select a preset with AI_GUI_PROFILE=default|fast|int8|bf16 (or main.py --profile) and the thread
+# count with AI_GUI_THREADS / AI_GUI_INTEROP_THREADS.
+
+import contextlib  # Combines the inference-mode and autocast contexts
+import functools  # Keeps the wrapped method's name
+import os  # Reads the environment settings
+
+
+def cpu_supports_bf16():  # True when the CPU has native bfloat16 instructions (AVX512-BF16 or AMX)
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:  # Linux only; other systems fall back to fp32
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+class InferenceProfile:  # How a pipeline's model is prepared for CPU inference
+    def __init__(self, name="custom", quantize=False, num_threads=None, interop_threads=None,
+                 bf16=False, inference_mode=False):
+        self.name = name  # Shown in benchmarks and logs
+        self.quantize = quantize  # Dynamic int8 quantization of every torch.nn.Linear layer
+        self.num_threads = num_threads  # torch.set_num_threads (None leaves torch's default)
+        self.interop_threads = interop_threads  # torch.set_num_interop_threads (None leaves the default)
+        self.bf16 = bf16  # bfloat16 autocast, only on CPUs that support it natively
+        self.inference_mode = inference_mode  # Run the model under torch.inference_mode()
+
+    def __repr__(self):
+        return (f"InferenceProfile(name={self.name!r}, quantize={self.quantize}, num_threads={self.num_threads}, "
+                f"interop_threads={self.interop_threads}, bf16={self.bf16}, inference_mode={self.inference_mode})")
+
+    @property
+    def is_default(self):  # True when applying the profile changes nothing
+        return not (self.quantize or self.num_threads or self.interop_threads or self.bf16 or self.inference_mode)
+
+    def cache_params(self):  # Settings that change model outputs; part of every result-cache key
+        return {"profile": self.name, "quantize": bool(self.quantize), "bf16": bool(self.bf16)}
+
+    def apply_threads(self):  # Thread settings are process-wide in torch
+        import torch
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        if self.interop_threads:
+            try:
+                torch.set_num_interop_threads(self.interop_threads)
+            except RuntimeError:  # Can only be set before torch starts its first parallel work
+                print(f"Inter-op threads already in use; keeping {torch.get_num_interop_threads()}")
+
+    def apply(self, pipe):  # Tunes a loaded Hugging Face pipeline in place and returns it
+        if self.is_default:
+            return pipe
+        import torch  # Only needed when the profile actually changes something
+        self.apply_threads()
+        model = getattr(pipe, "model", None)
+        if self.quantize and isinstance(model, torch.nn.Module):
+            # Linear weights become int8; activations are quantized on the fly, so this stays fp32 elsewhere
+            pipe.model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+        contexts = []  # Entered around every forward pass
+        if self.inference_mode:
+            contexts.append(torch.inference_mode)
+        if self.bf16 and not self.quantize:  # Quantized layers expect fp32 activations
+            if cpu_supports_bf16():
+                contexts.append(lambda: torch.autocast("cpu", dtype=torch.bfloat16))
+            else:
+                print("bf16 requested but this CPU has no native bfloat16 support; using fp32")
+        if contexts and callable(getattr(pipe, "forward", None)):
+            pipe.forward = _within(pipe.forward, contexts)  # The pipeline calls self.forward for each input
+        return pipe
+
+
+def _within(method, contexts):  # Wraps method so each call runs inside the given contexts
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with contextlib.ExitStack() as stack:
+            for context in contexts:
+                stack.enter_context(context())
+            return method(*args, **kwargs)
+    return wrapper
+
+
+def _env_int(name):  # Integer environment setting, or None
+    value = os.environ.get(name, "").strip()
+    return int(value) if value else None
+
+
+PROFILES = {  # Presets, from the untouched default to the most aggressive
+    "default": lambda threads, interop: InferenceProfile("default", num_threads=threads, interop_threads=interop),
+    "fast": lambda threads, interop: InferenceProfile("fast", num_threads=threads, interop_threads=interop,
+                                                      inference_mode=True),
+    "int8": lambda threads, interop: InferenceProfile("int8", quantize=True, num_threads=threads,
+                                                      interop_threads=interop, inference_mode=True),
+    "bf16": lambda threads, interop: InferenceProfile("bf16", bf16=True, num_threads=threads,
+                                                      interop_threads=interop, inference_mode=True),
+}
+
+
+def get_profile(name, num_threads=None, interop_threads=None):  # Builds a preset by name
+    if name not in PROFILES:
+        raise ValueError(f"Unknown inference profile {name!r}; choose from {', '.join(PROFILES)}")
+    return PROFILES[name](num_threads, interop_threads)
+
+
+def profile_from_env(name=None, num_threads=None, interop_threads=None):  # Arguments override AI_GUI_PROFILE/THREADS/INTEROP_THREADS
+    name = name or os.environ.get("AI_GUI_PROFILE", "default").strip().lower() or "default"
+    num_threads = num_threads or _env_int("AI_GUI_THREADS")
+    interop_threads = interop_threads or _env_int("AI_GUI_INTEROP_THREADS")
+    return get_profile(name, num_threads, interop_threads)  # Thread settings apply to every preset, default included
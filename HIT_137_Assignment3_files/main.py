@@ -1,7 +1,24 @@
 # This file launches the Tkinter GUI
 
+import argparse  # Reads command-line options
+import atexit  # Saves metrics when the program exits
 from gui_base import AIModelGUI  # Import the main GUI base file
+from metrics import metrics  # Timing/memory registry filled by the instrument decorator
+from inference_profile import PROFILES, profile_from_env  # CPU inference presets
+from pipeline_registry import PipelineRegistry, set_registry  # Shared model registry
 
 if __name__ == "__main__":  # Runs script directly
-    app = AIModelGUI()  # Create an instance of the GUI
+    parser = argparse.ArgumentParser(description="HIT137 AI Model Display")  # Command-line options
+    parser.add_argument("--warm-up", action="store_true", help="load both models in the background at start")
+    parser.add_argument("--metrics", metavar="PATH", help="record timings and save them on exit (.prom for Prometheus text, else JSON)")
+    parser.add_argument("--metrics-memory", action="store_true", help="with --metrics, also record the Python heap peak (tracemalloc)")
+    parser.add_argument("--profile", choices=list(PROFILES), help="CPU inference preset (default: AI_GUI_PROFILE or 'default')")
+    parser.add_argument("--threads", type=int, help="torch intra-op threads (any profile; default: AI_GUI_THREADS)")
+    args = parser.parse_args()
+    if args.profile or args.threads:  # Overrides the profile/threads chosen through the environment
+        set_registry(PipelineRegistry(profile=profile_from_env(args.profile, args.threads)))
+    if args.metrics:  # Same as AI_GUI_METRICS=1 (or =memory), plus a file written on exit
+        metrics.enable(trace_memory=args.metrics_memory)
+        atexit.register(metrics.dump, args.metrics)
+    app = AIModelGUI(warm_up=args.warm_up)  # Create an instance of the GUI
     app.mainloop()  # Start the Tkinter loop to keep window open
@@ -0,0 +1,215 @@
+# metrics.py — In-process timing metrics (wall time, CPU time, memory, call counts)
+#
+# Off by default. Turn on with AI_GUI_METRICS=1 (time, counts and process RSS) or AI_GUI_METRICS=memory
+# (also the Python heap peak via tracemalloc, which slows allocation-heavy code), or call metrics.enable().
+# Model weights and tensors are native allocations: only the RSS figures include them.
+
+import contextlib  # Shared do-nothing context manager for when metrics are off
+import functools  # Keeps the wrapped function's name and docstring
+import json  # JSON export
+import os  # Reads the environment switch and the page size
+import sys  # Platform check for ru_maxrss units
+import threading  # Protects the counters; tracks nested timers per thread
+import time  # Wall and CPU clocks
+import tracemalloc  # Peak of Python heap allocations
+
+try:
+    import resource  # Peak RSS on Unix
+except ImportError:  # Windows
+    resource = None
+
+_SETTING = os.environ.get("AI_GUI_METRICS", "").strip().lower()  # "", "0", "1" or "memory"
+_NULL_TIMER = contextlib.nullcontext()  # Returned when metrics are off: nothing is measured
+_heap_lock = threading.Lock()  # Guards _heap_owner
+_heap_owner = None  # Thread whose timers currently own tracemalloc's (process-global) peak
+
+
+def _rss_bytes():  # Current resident set size of the process, or None where unknown
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:  # Linux: cheap, no extra dependency
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil  # Optional elsewhere
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+def _peak_rss_bytes():  # Highest RSS the process has reached so far, or None where unknown
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Bytes on macOS, KB on Linux
+
+
+class _Timer:  # Measures one block and records it in the registry
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.seen_peak = 0  # Highest absolute heap peak reported by nested timers
+        self.owns_heap = False  # True when this timer resets and reads tracemalloc's peak
+
+    def _claim_heap(self):  # Only one thread at a time may reset the process-global tracemalloc peak
+        global _heap_owner
+        with _heap_lock:
+            if _heap_owner is None or _heap_owner == threading.get_ident():
+                _heap_owner = threading.get_ident()
+                return True
+            return False  # Another thread is measuring: skip the heap figure rather than corrupt its peak
+
+    def __enter__(self):
+        if self.registry.trace_memory and self._claim_heap():
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            stack = self.registry._stack()
+            self.start_memory, peak = tracemalloc.get_traced_memory()
+            if stack:  # Hand the outer timer the peak reached so far before resetting it
+                stack[-1].seen_peak = max(stack[-1].seen_peak, peak)
+            tracemalloc.reset_peak()
+            stack.append(self)
+            self.owns_heap = True
+        self.start_rss = _rss_bytes()
+        self.start_cpu = time.process_time()  # CPU time of all threads (model libraries use several)
+        self.start_wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _heap_owner
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+        end_rss = _rss_bytes()
+        rss_delta = end_rss - self.start_rss if end_rss is not None and self.start_rss is not None else None
+        heap_peak = None
+        if self.owns_heap:
+            stack = self.registry._stack()
+            if stack and stack[-1] is self:
+                stack.pop()
+            if tracemalloc.is_tracing():
+                peak = max(tracemalloc.get_traced_memory()[1], self.seen_peak)
+                if stack:
+                    stack[-1].seen_peak = max(stack[-1].seen_peak, peak)
+                heap_peak = max(0, peak - self.start_memory)  # Extra Python heap needed by this block at its peak
+            if not stack:  # Outermost timer of the owning thread: let other threads measure again
+                with _heap_lock:
+                    _heap_owner = None
+        self.registry.record(self.name, wall, cpu, heap_peak, error=exc_type is not None,
+                             rss_delta=rss_delta, peak_rss=_peak_rss_bytes(), **self.labels)
+        return False  # Never swallows exceptions
+
+
+class Metrics:  # Registry of measurements keyed by name and labels
+    def __init__(self, enabled=_SETTING not in ("", "0", "false", "off"), trace_memory=_SETTING == "memory"):
+        self.enabled = enabled  # Checked first by every timer; off means near-zero overhead
+        self.trace_memory = enabled and trace_memory  # tracemalloc is only used when asked for
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {}  # (name, labels) -> totals
+
+    def enable(self, trace_memory=False):  # Turns measurement on at runtime
+        self.trace_memory = trace_memory
+        self.enabled = True
+
+    def disable(self):  # Turns measurement off (already recorded numbers are kept)
+        self.enabled = False
+        self.trace_memory = False
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _stack(self):  # Timers currently open on this thread, innermost last
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def timer(self, name, **labels):  # Context manager measuring one block: with metrics.timer("inference"):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def timed(self, name, func, **labels):  # Wraps func so every call is measured under name
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:  # Disabled: one attribute check per call
+                return func(*args, **kwargs)
+            with _Timer(self, name, labels):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def record(self, name, wall, cpu, heap_peak=None, error=False, rss_delta=None, peak_rss=None,
+               **labels):  # Adds one measurement
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {"calls": 0, "errors": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+                                            "max_wall_seconds": 0.0, "max_rss_growth_bytes": None,
+                                            "peak_rss_bytes": None, "python_heap_peak_bytes": None}
+            stats["calls"] += 1
+            stats["errors"] += bool(error)
+            stats["wall_seconds"] += wall
+            stats["cpu_seconds"] += cpu
+            stats["max_wall_seconds"] = max(stats["max_wall_seconds"], wall)
+            for field, value in (("max_rss_growth_bytes", rss_delta), ("peak_rss_bytes", peak_rss),
+                                 ("python_heap_peak_bytes", heap_peak)):
+                if value is not None:
+                    stats[field] = value if stats[field] is None else max(stats[field], value)
+
+    def reset(self):  # Forgets everything recorded so far
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self):  # List of {"name", "labels", counters...}, sorted by name
+        with self._lock:
+            return [{"name": name, "labels": dict(labels), **stats}
+                    for (name, labels), stats in sorted(self._stats.items())]
+
+    def to_json(self):  # Snapshot as JSON text
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix="ai_gui"):  # Snapshot in the Prometheus text exposition format
+        series = [("calls_total", "counter", "calls", "Number of calls."),
+                  ("errors_total", "counter", "errors", "Number of calls that raised an exception."),
+                  ("wall_seconds_total", "counter", "wall_seconds", "Total wall-clock time in seconds."),
+                  ("cpu_seconds_total", "counter", "cpu_seconds", "Total CPU time of the process in seconds."),
+                  ("wall_seconds_max", "gauge", "max_wall_seconds", "Slowest single call in seconds."),
+                  ("rss_growth_bytes_max", "gauge", "max_rss_growth_bytes",
+                   "Largest growth of process RSS over one call (includes native/torch memory)."),
+                  ("peak_rss_bytes", "gauge", "peak_rss_bytes", "Process peak RSS seen at the end of a call."),
+                  ("python_heap_peak_bytes", "gauge", "python_heap_peak_bytes",
+                   "Highest extra Python heap during a call (tracemalloc; excludes native/torch memory).")]
+        snapshot = self.snapshot()
+        lines = []
+        for suffix, kind, field, help_text in series:
+            metric = f"{prefix}_{suffix}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for entry in snapshot:
+                if entry[field] is None:  # Not measured on this platform or without AI_GUI_METRICS=memory
+                    continue
+                labels = {"name": entry["name"], **entry["labels"]}
+                label_text = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+                lines.append(f"{metric}{{{label_text}}} {entry[field]}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):  # Writes Prometheus text for .prom/.txt paths, JSON otherwise
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def _escape(value):  # Escapes a Prometheus label value
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def instrument_pipeline(pipe, model):  # Times a Hugging Face pipeline's preprocess, inference and postprocess stages
+    for stage, attribute in (("preprocess", "preprocess"), ("inference", "forward"), ("postprocess", "postprocess")):
+        method = getattr(pipe, attribute, None)
+        if callable(method):  # The pipeline calls these through self, so instance attributes take effect
+            setattr(pipe, attribute, metrics.timed(stage, method, model=model))
+    return pipe
+
+
+metrics = Metrics()  # The process-wide registry
@@ -1,24 +1,106 @@
-# model_runner.py — Handles AI model logic using Hugging Face and subprocess for audio playback
+# model_runner.py — Handles AI model logic using Hugging Face; speech is sent to an audio sink
 
 from PIL import Image  # Imports Python Imaging Library to load and process image files
-from transformers import pipeline  # Imports Hugging Face's pipeline API for easy model access
-import scipy.io.wavfile  # Provides functions to write audio data to WAV format
-import tempfile  # Allows creation of temporary files for storing audio output
-import subprocess  # Enables launching external applications like media players
+from pipeline_registry import get_registry, BLIP_MODEL, BARK_MODEL  # Shared registry that loads each model once
+from result_cache import get_result_cache  # Disk cache so repeated inputs skip inference
+from decorators import instrument  # Records time, memory and call counts when metrics are on
+from metrics import metrics  # Stage timers
+from audio_sinks import AsyncPlayerSink  # Plays speech in the background as it is generated
+import re  # Finds sentence boundaries in long text
 import numpy as np  # Imports NumPy for handling audio arrays and tensor operations
 
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")  # Whitespace after a full stop, question mark or exclamation mark
+MAX_CHUNK_CHARS = 220  # Bark produces about 13 seconds of audio per call, so longer text is split
+
+
+def split_into_chunks(text, max_chars=MAX_CHUNK_CHARS):  # Splits text at sentence boundaries into chunks Bark can speak
+    chunks, current = [], ""
+    for sentence in SENTENCE_END.split(" ".join(text.split())):  # Whitespace is normalised first
+        pieces = []
+        while len(sentence) > max_chars:  # A very long sentence is broken at the last space that fits
+            cut = sentence.rfind(" ", 0, max_chars + 1)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        pieces.append(sentence)
+        for piece in pieces:  # Short sentences are joined until the chunk is full
+            if current and len(current) + 1 + len(piece) <= max_chars:
+                current += " " + piece
+            else:
+                if current:
+                    chunks.append(current)
+                current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
 class ModelRunner:  # Defines a reusable class to encapsulate AI model logic
+    registry = None  # Pipeline registry to use; None means the process-wide one (tests can inject their own)
+    cache = None  # Result cache to use; None means the shared one on disk
+    audio_sink_factory = AsyncPlayerSink  # Default destination for speech; NullSink for headless runs
+
+    def get_pipeline(self, key):  # Returns a loaded pipeline for a (task, model) key
+        registry = self.registry or get_registry()  # Fall back to the shared registry
+        return registry.get(*key)  # Loads the model only the first time it is needed
+
+    def inference_params(self):  # Output-affecting settings of the active inference profile (int8, bf16)
+        return (self.registry or get_registry()).profile.cache_params()
+
+    def get_cache(self):  # Returns the result cache for this runner
+        return self.cache or get_result_cache()  # Fall back to the shared cache
+
+    @instrument  # Total time per caption, including cache hits
     def run_image_captioning(self, image_path):  # Method to generate captions from images using BLIP
+        cache = self.get_cache()  # Same image bytes + same model = same caption
+        key = cache.key_for_image(image_path, BLIP_MODEL[1], **self.inference_params())  # Image bytes, model ID and profile
+        caption = cache.get_caption(key)  # Cache hit returns without touching the model
+        if caption is not None:
+            return caption
         image = Image.open(image_path)  # Opens the image file using PIL
-        pipe = pipeline("image-to-text", model="Salesforce/blip-image-captioning-base")  # Loads BLIP model via Hugging Face pipeline
+        pipe = self.get_pipeline(BLIP_MODEL)  # Reuses the loaded BLIP pipeline instead of reloading it
         result = pipe(image)  # Runs inference on the image to generate a caption
-        return result[0]['generated_text']  # Extracts and returns the generated caption text
+        caption = result[0]['generated_text']  # Extracts the generated caption text
+        cache.put_caption(key, caption)  # Saves it for next time
+        return caption  # Returns the generated caption text
+
+    @instrument
+    def run_image_captioning_batch(self, images, batch_size=8):  # Captions a list of already-loaded PIL images
+        pipe = self.get_pipeline(BLIP_MODEL)  # Same shared BLIP pipeline as the GUI uses
+        results = pipe(images, batch_size=batch_size)  # Runs the model on batch_size images at a time
+        return [result[0]['generated_text'] for result in results]  # One caption per image, in order
 
-    def run_text_to_speech(self, text):  # Method to convert input text into speech using Bark
-        pipe = pipeline("text-to-audio", model="suno/bark")  # Load Bark model via Hugging Face pipeline
+    @instrument
+    def synthesize_speech(self, text):  # Returns (audio array, sample rate) for the text, from the cache when possible
+        cache = self.get_cache()  # Same (normalised) text + same model = same audio
+        key = cache.key_for_text(text, BARK_MODEL[1], **self.inference_params())  # Text, model ID and profile
+        cached = cache.get_audio(key)  # Cache hit returns without touching the model
+        if cached is not None:
+            return cached
 
+        pipe = self.get_pipeline(BARK_MODEL)  # Reuses the loaded Bark pipeline instead of reloading it
         result = pipe(text)  # Run inference on the input text to generate audio output
+        audio_array, sample_rate = self.audio_from_result(result)  # Checks and flattens Bark's output
+        cache.put_audio(key, audio_array, sample_rate)  # Saves the audio for next time
+        return audio_array, sample_rate
+
+    @instrument
+    def synthesize_speech_batch(self, texts):  # Like synthesize_speech, but uncached texts go to Bark in one call
+        cache = self.get_cache()
+        params = self.inference_params()
+        keys = [cache.key_for_text(text, BARK_MODEL[1], **params) for text in texts]  # One cache key per text
+        outputs = [cache.get_audio(key) for key in keys]  # None where the text still needs synthesizing
+        missing = [i for i, output in enumerate(outputs) if output is None]
+        if missing:
+            pipe = self.get_pipeline(BARK_MODEL)
+            results = pipe([texts[i] for i in missing], batch_size=len(missing))  # One batched model call
+            for i, result in zip(missing, results):
+                outputs[i] = self.audio_from_result(result)
+                cache.put_audio(keys[i], *outputs[i])
+        return outputs
 
+    @staticmethod
+    def audio_from_result(result):  # Extracts (audio array, sample rate) from a Bark pipeline result
         # Validate that the result is a dictionary with expected keys
         if isinstance(result, dict) and "audio" in result and "sampling_rate" in result:
             audio_array = result["audio"]  # Extract the audio waveform as a NumPy array
@@ -29,14 +111,26 @@ class ModelRunner:  # Defines a reusable class to encapsulate AI model logic
         # Bark returns audio in shape (1, N) — flatten to 1D for WAV compatibility
         if isinstance(audio_array, np.ndarray) and audio_array.ndim == 2:  # Check if audio is a 2D array
             audio_array = audio_array.squeeze()  # Convert shape from (1, N) to (N,) for proper WAV formatting
+        return audio_array, sample_rate
 
-        # Create a temporary WAV file to store the audio output
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:  # Create a temp file with .wav extension
-            tmp_path = tmp.name  # Save the file path before closing the file
-            scipy.io.wavfile.write(tmp_path, rate=sample_rate, data=audio_array)  # Write audio data to the WAV file
-
-        # Play the audio file using the system's default media player (Windows only)
-        subprocess.run(["start", "", tmp_path], shell=True)  # Launch the file using 'start' to open with default app
-
-
+    def stream_speech(self, chunks, batch_size=1):  # Yields (audio, sample rate) for each chunk, in order
+        if batch_size <= 1:  # One chunk per call: the first audio is ready soonest
+            for chunk in chunks:
+                yield self.synthesize_speech(chunk)
+            return
+        for i in range(0, len(chunks), batch_size):  # Several chunks per call: higher throughput on a GPU
+            yield from self.synthesize_speech_batch(chunks[i:i + batch_size])
 
+    @instrument
+    def run_text_to_speech(self, text, batch_size=1, sink=None):  # Speaks the text chunk by chunk; returns the sink
+        chunks = split_into_chunks(text)  # Sentence-sized pieces so playback can start early
+        if not chunks:
+            raise ValueError("There is no text to speak.")
+        sink = sink or self.audio_sink_factory()  # Speakers by default; memory, file or null sinks on request
+        try:
+            for audio, sample_rate in self.stream_speech(chunks, batch_size):  # Next chunk is synthesized while this one plays
+                with metrics.timer("audio_output"):  # PCM conversion and hand-off to the sink
+                    sink.write(audio, sample_rate)  # Converted to 16-bit PCM once, inside the sink
+        finally:
+            sink.close()  # Finishes the output (a player keeps playing what is queued)
+        return sink
@@ -0,0 +1,125 @@
+# pipeline_registry.py — Loads each Hugging Face pipeline once and shares it across the app
+
+import os  # Reads the memory budget from the environment
+import threading  # Guards the registry and runs the background warm-up
+from collections import OrderedDict  # Keeps loaded pipelines in least-recently-used order
+from metrics import metrics, instrument_pipeline  # Times model loading and each pipeline stage
+from inference_profile import profile_from_env  # CPU tuning (int8, threads, bf16) applied after loading
+
+BLIP_MODEL = ("image-to-text", "Salesforce/blip-image-captioning-base")  # (task, model) key for captioning
+BARK_MODEL = ("text-to-audio", "suno/bark")  # (task, model) key for text-to-speech
+DEFAULT_MEMORY_BUDGET_MB = float(os.environ.get("MODEL_MEMORY_BUDGET_MB", "8192"))  # Budget for loaded weights
+
+
+def default_factory(task, model):  # Builds a real Hugging Face pipeline
+    from transformers import pipeline  # Imported lazily so the registry itself loads instantly
+    return pipeline(task, model=model)  # Downloads (first time) and loads the model weights
+
+
+def _tensor_bytes(value):  # Bytes held by a tensor, or by the tensors in a tuple/list
+    if hasattr(value, "element_size") and hasattr(value, "numel"):
+        return value.numel() * value.element_size()
+    if isinstance(value, (tuple, list)):  # int8-quantized Linear layers store (weight, bias) tuples
+        return sum(_tensor_bytes(item) for item in value)
+    return 0
+
+
+def estimate_size_mb(pipe):  # Estimates how much memory a pipeline's weights use
+    model = getattr(pipe, "model", None)  # Hugging Face pipelines keep the torch model here
+    if model is None or not hasattr(model, "state_dict"):  # Stand-in pipelines have no weights
+        return 0.0
+    return sum(_tensor_bytes(value) for value in model.state_dict().values()) / (1024 * 1024)  # Bytes to MB
+
+
+class PipelineRegistry:  # Process-wide cache of loaded pipelines with LRU eviction
+    def __init__(self, factory=default_factory, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB,
+                 size_estimator=estimate_size_mb, profile=None):
+        self.factory = factory  # Default way to build a pipeline: factory(task, model)
+        self.memory_budget_mb = memory_budget_mb  # Least recently used models are evicted above this
+        self.size_estimator = size_estimator  # Measures a loaded pipeline in MB
+        self.profile = profile or profile_from_env()  # Applied to every pipeline right after it loads
+        self._factories = {}  # Per-model factory overrides, e.g. lightweight stand-ins in tests
+        self._pipelines = OrderedDict()  # (task, model) -> (pipeline, size in MB), oldest first
+        self._lock = threading.Lock()  # Protects the dictionaries above
+        self._key_locks = {}  # One lock per model so each model is only ever loaded once
+
+    def register_factory(self, task, model, factory):  # Overrides how one model is built
+        with self._lock:
+            self._factories[(task, model)] = factory
+
+    def get(self, task, model):  # Returns the loaded pipeline, loading it on first use
+        key = (task, model)
+        with self._lock:
+            if key in self._pipelines:  # Already loaded: mark as most recently used
+                self._pipelines.move_to_end(key)
+                return self._pipelines[key][0]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:  # Other models stay usable while this one loads
+            with self._lock:
+                if key in self._pipelines:  # Loaded by another thread while we waited
+                    self._pipelines.move_to_end(key)
+                    return self._pipelines[key][0]
+                factory = self._factories.get(key, self.factory)
+            with metrics.timer("model_load", model=model):  # Slow part: runs outside the registry lock
+                pipe = self.profile.apply(factory(task, model))  # Quantization, threads and precision
+                pipe = instrument_pipeline(pipe, model)  # Times preprocess/inference/postprocess
+            size = self.size_estimator(pipe)
+            with self._lock:
+                self._pipelines[key] = (pipe, size)
+                self._evict_over_budget(keep=key)
+            return pipe
+
+    def _evict_over_budget(self, keep):  # Drops least recently used pipelines until under budget
+        while self.memory_used_mb() > self.memory_budget_mb and len(self._pipelines) > 1:
+            oldest = next(iter(self._pipelines))  # Least recently used entry
+            if oldest == keep:  # Never evict the pipeline that was just requested
+                break
+            del self._pipelines[oldest]
+
+    def memory_used_mb(self):  # Estimated memory of every loaded pipeline
+        return sum(size for _, size in self._pipelines.values())
+
+    def loaded(self):  # Keys of the loaded pipelines, least recently used first
+        with self._lock:
+            return list(self._pipelines)
+
+    def evict(self, task, model):  # Unloads one pipeline (no-op if it is not loaded)
+        with self._lock:
+            self._pipelines.pop((task, model), None)
+
+    def clear(self):  # Unloads every pipeline
+        with self._lock:
+            self._pipelines.clear()
+
+    def warm_up(self, keys=(BLIP_MODEL, BARK_MODEL), background=True):  # Preloads models before first use
+        def load_all():
+            for task, model in keys:
+                try:
+                    self.get(task, model)
+                except Exception as e:  # A failed warm-up is retried on first real use
+                    print(f"Warm-up failed for {model}: {e}")
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, name="model-warm-up", daemon=True)  # Won't block app exit
+        thread.start()
+        return thread
+
+
+_registry = None  # The shared registry, created on first use
+_registry_lock = threading.Lock()
+
+
+def get_registry():  # Returns the process-wide registry
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PipelineRegistry()
+        return _registry
+
+
+def set_registry(registry):  # Replaces the process-wide registry (e.g. with stand-in factories)
+    global _registry
+    with _registry_lock:
+        _registry = registry
@@ -0,0 +1,142 @@
+# result_cache.py — Disk cache for captions and speech so repeated inputs skip model inference
+
+import hashlib  # Hashes image bytes and text into cache keys
+import json  # Serialises the key fields (model ID and parameters) in a stable order
+import os  # File paths, timestamps and environment settings
+import tempfile  # Unique temporary files for atomic writes
+import threading  # Keeps the hit/miss counters consistent across worker threads
+import numpy as np  # Stores synthesized audio as NumPy arrays
+
+DEFAULT_CACHE_DIR = os.environ.get("MODEL_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".hit137_model_cache"))  # Cache folder
+DEFAULT_MAX_MB = float(os.environ.get("MODEL_CACHE_MAX_MB", "500"))  # Oldest entries are removed above this size
+EVICT_TO = 0.9  # Eviction frees down to this share of the budget, so a full cache isn't rescanned on every write
+
+
+def normalise_text(text):  # Collapses whitespace so trivially different inputs share a cache entry
+    return " ".join(text.split())
+
+
+class ResultCache:  # Content-addressed cache: the key is a hash of the input, the model ID and its parameters
+    def __init__(self, folder=DEFAULT_CACHE_DIR, max_mb=DEFAULT_MAX_MB):
+        self.folder = folder  # Where cached results are written
+        self.max_mb = max_mb  # Size budget for the whole cache folder
+        self.hits = 0  # Lookups answered from the cache
+        self.misses = 0  # Lookups that needed inference
+        self._lock = threading.Lock()  # Protects the counters, the size total and eviction
+        self._size = None  # Bytes in the folder as of the last scan plus our writes since; None before a scan
+        os.makedirs(folder, exist_ok=True)  # Creates the cache folder on first use
+
+    def key_for_image(self, image_path, model, **params):  # Key from the image's bytes (not its name)
+        digest = hashlib.sha256()
+        with open(image_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):  # Reads 1 MB at a time
+                digest.update(block)
+        return self._key("image", digest.hexdigest(), model, params)
+
+    def key_for_text(self, text, model, **params):  # Key from the normalised text
+        digest = hashlib.sha256(normalise_text(text).encode("utf-8")).hexdigest()
+        return self._key("text", digest, model, params)
+
+    def _key(self, kind, digest, model, params):  # Combines input hash, model ID and parameters
+        fields = json.dumps([kind, digest, model, params], sort_keys=True, default=str)
+        return hashlib.sha256(fields.encode("utf-8")).hexdigest()
+
+    def _path(self, key, suffix):  # File that holds one cached result
+        return os.path.join(self.folder, key + suffix)
+
+    def _count(self, hit):  # Updates the hit/miss counters
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _read(self, path, read):  # read(path) for a cached entry, or None if it is missing
+        try:
+            os.utime(path)  # Recency for LRU eviction is tracked with the file's modification time
+            value = read(path)
+        except (OSError, ValueError, EOFError):  # Missing, or evicted/damaged between the checks: a miss
+            self._count(False)
+            return None
+        self._count(True)
+        return value
+
+    def _write(self, path, write):  # Writes to a temporary file first so readers never see half a result
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix=".tmp")  # Unique across threads and processes
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            size = os.path.getsize(tmp_path)
+            try:
+                size -= os.path.getsize(path)  # Overwriting an entry replaces its bytes
+            except OSError:
+                pass
+            os.replace(tmp_path, path)  # Atomic on the same file system
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+            over_budget = self._size is None or self._size > self.max_mb * 1024 * 1024
+        if over_budget:  # Only then is the folder scanned; other processes' writes are picked up here
+            self.evict()
+
+    def get_caption(self, key):  # Cached caption, or None on a miss
+        def read(path):
+            with open(path, encoding="utf-8") as f:
+                return f.read()
+        return self._read(self._path(key, ".txt"), read)
+
+    def put_caption(self, key, caption):  # Stores a caption as plain text
+        self._write(self._path(key, ".txt"), lambda f: f.write(caption.encode("utf-8")))
+
+    def get_audio(self, key):  # Cached (audio array, sampling rate), or None on a miss
+        def read(path):
+            with np.load(path) as data:
+                return data["audio"], int(data["sampling_rate"])
+        return self._read(self._path(key, ".npz"), read)
+
+    def put_audio(self, key, audio, sampling_rate):  # Stores audio and its rate as NPY arrays in one .npz file
+        self._write(self._path(key, ".npz"), lambda f: np.savez(f, audio=audio, sampling_rate=sampling_rate))
+
+    def evict(self):  # Removes the least recently used entries until the cache fits its budget
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.folder):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            budget = self.max_mb * 1024 * 1024
+            target = budget * EVICT_TO if total > budget else budget
+            for _, size, path in sorted(entries):  # Oldest first
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:  # Already removed by another process
+                    pass
+                total -= size
+            self._size = total
+
+    def stats(self):  # Counters for monitoring
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+_cache = None  # The shared cache, created on first use
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():  # Returns the process-wide result cache
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
@@ -1,181 +1,1049 @@
-import random
-def choose_with_vowel_bias(option1, option2):
-    """
-    Prefer vowels when resolving collisions:
-      - If only one option is a vowel, choose it
-      - If both or neither are vowels, pick randomly
-    """
-    vowels = "aeiouAEIOU"
-    o1_is_vowel = option1 in vowels
-    o2_is_vowel = option2 in vowels
-    if o1_is_vowel and not o2_is_vowel:
-        return option1
-    elif o2_is_vowel and not o1_is_vowel:
-        return option2
-    else:
-        # both vowel or both not vowel → random fallback
-        return option1 if random.randint(1, 2) == 1 else option2
-    
-    
-    
-    
-    
-def encrypt_file(shift1, shift2):
-    """
-    Encrypt the contents of 'raw_text.txt' following the assignment rules and
-    write the result to 'encrypted_text.txt'.
-
-    Rules:
-      - Lowercase a-m: shift forward by (shift1 * shift2)
-      - Lowercase n-z: shift backward by (shift1 + shift2)
-      - Uppercase A-M: shift backward by shift1
-      - Uppercase N-Z: shift forward by (shift2 ** 2)
-      - Non-alphabetic characters are unchanged
-
-    Note: large shift values naturally wrap around via modulo 26 arithmetic.
-    """
-    with open('raw_text.txt', 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    encrypted = []
-    for char in content:
-        if 'a' <= char <= 'z':
-            if char <= 'm':  # a-m
-                new_char = chr((ord(char) - ord('a') + shift1 * shift2) % 26 + ord('a'))
-            else:  # n-z
-                new_char = chr((ord(char) - ord('a') - (shift1 + shift2)) % 26 + ord('a'))
-            encrypted.append(new_char)
-        elif 'A' <= char <= 'Z':
-            if char <= 'M':  # A-M
-                new_char = chr((ord(char) - ord('A') - shift1) % 26 + ord('A'))
-            else:  # N-Z
-                new_char = chr((ord(char) - ord('A') + shift2**2) % 26 + ord('A'))
-            encrypted.append(new_char)
-        else:
-            encrypted.append(char)
-
-    encrypted_str = ''.join(encrypted)
-    with open('encrypted_text.txt', 'w', encoding='utf-8') as f:
-        f.write(encrypted_str)
-
-    print("Encrypted content:")
-    print(encrypted_str)
-    return encrypted_str
-
-
-def decrypt_file(shift1, shift2):
-    """
-    Attempt to decrypt 'encrypted_text.txt' and write the reconstructed text to
-    'decrypted_text.txt'.
-
-    Because the assignment cipher can produce collisions (two different originals
-    mapping to the same encrypted character), this function:
-      - computes both mathematical pre-images for each alphabetic char
-      - randomly picks one when both are valid (collision)
-      - prints up to MAX_PRINT collision messages and then summarizes remaining
-    Returns: (decrypted_string, collision_count)
-    """
-    with open('encrypted_text.txt', 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    decrypted = []
-    collision_count = 0
-    printed_messages = 0
-    MAX_PRINT = 5
-
-    for char in content:
-        if 'a' <= char <= 'z':
-            # inverse if original was a..m (inverse of forward shift)
-            option1 = chr((ord(char) - ord('a') - shift1 * shift2) % 26 + ord('a'))
-            # inverse if original was n..z (inverse of backward shift)
-            option2 = chr((ord(char) - ord('a') + shift1 + shift2) % 26 + ord('a'))
-
-            # collision: both options fall in their expected halves
-            if option1 <= 'm' and option2 >= 'n':
-                collision_count += 1
-                chosen = option1 if random.randint(1, 2) == 1 else option2
-                decrypted.append(chosen)
-                if printed_messages < MAX_PRINT:
-                    print(f"Collision at {char}: could be {option1} or {option2}, chose {chosen}")
-                    printed_messages += 1
-            elif option1 <= 'm':
-                decrypted.append(option1)
-            else:
-                decrypted.append(option2)
-
-        elif 'A' <= char <= 'Z':
-            option1 = chr((ord(char) - ord('A') + shift1) % 26 + ord('A'))          # inverse of A..M branch
-            option2 = chr((ord(char) - ord('A') - shift2**2) % 26 + ord('A'))       # inverse of N..Z branch
-
-            if option1 <= 'M' and option2 >= 'N':
-                collision_count += 1
-                chosen = option1 if random.randint(1, 2) == 1 else option2
-                decrypted.append(chosen)
-                if printed_messages < MAX_PRINT:
-                    print(f"Collision at {char}: could be {option1} or {option2}, chose {chosen}")
-                    printed_messages += 1
-            elif option1 <= 'M':
-                decrypted.append(option1)
-            else:
-                decrypted.append(option2)
-
-        else:
-            decrypted.append(char)
-
-    decrypted_str = ''.join(decrypted)
-    with open('decrypted_text.txt', 'w', encoding='utf-8') as f:
-        f.write(decrypted_str)
-
-    if collision_count > printed_messages:
-        remaining = collision_count - printed_messages
-        print(f"...and {remaining} more collisions.")
-
-    print(f"\nDecrypted content (had {collision_count} collisions):")
-    print(decrypted_str)
-    return decrypted_str, collision_count
-
-
-def verify_files():
-    """
-    Compare 'raw_text.txt' and 'decrypted_text.txt'.
-    Print the first mismatch excerpt if files differ.
-    Returns True if they match exactly, False otherwise.
-    """
-    with open('raw_text.txt', 'r', encoding='utf-8') as f1, \
-         open('decrypted_text.txt', 'r', encoding='utf-8') as f2:
-        original = f1.read()
-        decrypted = f2.read()
-
-    if original == decrypted:
-        print("✅ Perfect match! No errors in decryption.")
-        return True
-
-    print("❌ Decryption has errors due to collisions.")
-    for i, (o_char, d_char) in enumerate(zip(original, decrypted)):
-        if o_char != d_char:
-            start = max(0, i - 10)
-            end = min(len(original), i + 10)
-            print(f"First difference at position {i}:")
-            print(f"Original: ...{original[start:end]}...")
-            print(f"Decrypted: ...{decrypted[start:end]}...")
-            break
-    return False
-
-
-if __name__ == "__main__":
-    try:
-        shift1 = int(input("Enter shift1: "))
-        shift2 = int(input("Enter shift2: "))
-    except ValueError:
-        print("Please enter valid integers")
-        raise SystemExit(1)
-
-    # Run the full pipeline: encrypt -> decrypt -> verify
-    encrypt_file(shift1, shift2)
-    decrypted, collisions = decrypt_file(shift1, shift2)
-    success = verify_files()
-
-    if collisions > 0:
-        print(f"\nNote: There were {collisions} collisions during decryption.")
-        print("The decryption had to make guesses, which may not always be correct.")
-        print("This is a limitation of the encryption method specified in the assignment.")
+import argparse
+import json
+import math
+import mmap
+import os
+import random
+import re
+import string
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+def choose_with_vowel_bias(option1, option2):
+    """
+    Prefer vowels when resolving collisions:
+      - If only one option is a vowel, choose it
+      - If both or neither are vowels, pick randomly
+    """
+    vowels = "aeiouAEIOU"
+    o1_is_vowel = option1 in vowels
+    o2_is_vowel = option2 in vowels
+    if o1_is_vowel and not o2_is_vowel:
+        return option1
+    elif o2_is_vowel and not o1_is_vowel:
+        return option2
+    else:
+        # both vowel or both not vowel → random fallback
+        return option1 if random.randint(1, 2) == 1 else option2
+    
+    
+    
+    
+    
+CHUNK_SIZE = 1 << 20  # characters per chunk in streaming mode
+MAX_PRINT = 5  # collision messages printed before summarising
+
+
+class CollisionReporter:
+    """
+    Print the first `limit` collisions and count the rest, so a file with
+    millions of collisions does not flood the console.
+    """
+
+    def __init__(self, limit=MAX_PRINT):
+        self.limit = limit
+        self.printed = 0
+
+    def __call__(self, char, option1, option2, chosen):
+        if self.printed < self.limit:
+            print(f"Collision at {char}: could be {option1} or {option2}, chose {chosen}")
+            self.printed += 1
+
+    def summary(self, collision_count):
+        if collision_count > self.printed:
+            remaining = collision_count - self.printed
+            print(f"...and {remaining} more collisions.")
+
+
+def encrypt_text_reference(text, shift1, shift2):
+    """
+    Reference implementation: encrypt a string one character at a time
+    following the assignment rules and return the result.
+
+    Rules:
+      - Lowercase a-m: shift forward by (shift1 * shift2)
+      - Lowercase n-z: shift backward by (shift1 + shift2)
+      - Uppercase A-M: shift backward by shift1
+      - Uppercase N-Z: shift forward by (shift2 ** 2)
+      - Non-alphabetic characters are unchanged
+
+    Note: large shift values naturally wrap around via modulo 26 arithmetic.
+    """
+    encrypted = []
+    for char in text:
+        if 'a' <= char <= 'z':
+            if char <= 'm':  # a-m
+                new_char = chr((ord(char) - ord('a') + shift1 * shift2) % 26 + ord('a'))
+            else:  # n-z
+                new_char = chr((ord(char) - ord('a') - (shift1 + shift2)) % 26 + ord('a'))
+            encrypted.append(new_char)
+        elif 'A' <= char <= 'Z':
+            if char <= 'M':  # A-M
+                new_char = chr((ord(char) - ord('A') - shift1) % 26 + ord('A'))
+            else:  # N-Z
+                new_char = chr((ord(char) - ord('A') + shift2**2) % 26 + ord('A'))
+            encrypted.append(new_char)
+        else:
+            encrypted.append(char)
+    return ''.join(encrypted)
+
+
+def decrypt_text_reference(text, shift1, shift2, on_collision=None):
+    """
+    Reference implementation: decrypt a string produced by `encrypt_text`
+    one character at a time.
+
+    Because the assignment cipher can produce collisions (two different originals
+    mapping to the same encrypted character), this function:
+      - computes both mathematical pre-images for each alphabetic char
+      - randomly picks one when both are valid (collision)
+      - calls on_collision(char, option1, option2, chosen) for every collision
+    Returns: (decrypted_string, collision_count)
+    """
+    decrypted = []
+    collision_count = 0
+
+    for char in text:
+        if 'a' <= char <= 'z':
+            # inverse if original was a..m (inverse of forward shift)
+            option1 = chr((ord(char) - ord('a') - shift1 * shift2) % 26 + ord('a'))
+            # inverse if original was n..z (inverse of backward shift)
+            option2 = chr((ord(char) - ord('a') + shift1 + shift2) % 26 + ord('a'))
+
+            # collision: both options fall in their expected halves
+            if option1 <= 'm' and option2 >= 'n':
+                collision_count += 1
+                chosen = option1 if random.randint(1, 2) == 1 else option2
+                decrypted.append(chosen)
+                if on_collision is not None:
+                    on_collision(char, option1, option2, chosen)
+            elif option1 <= 'm':
+                decrypted.append(option1)
+            else:
+                decrypted.append(option2)
+
+        elif 'A' <= char <= 'Z':
+            option1 = chr((ord(char) - ord('A') + shift1) % 26 + ord('A'))          # inverse of A..M branch
+            option2 = chr((ord(char) - ord('A') - shift2**2) % 26 + ord('A'))       # inverse of N..Z branch
+
+            if option1 <= 'M' and option2 >= 'N':
+                collision_count += 1
+                chosen = option1 if random.randint(1, 2) == 1 else option2
+                decrypted.append(chosen)
+                if on_collision is not None:
+                    on_collision(char, option1, option2, chosen)
+            elif option1 <= 'M':
+                decrypted.append(option1)
+            else:
+                decrypted.append(option2)
+
+        else:
+            decrypted.append(char)
+
+    return ''.join(decrypted), collision_count
+
+
+@lru_cache(maxsize=128)
+def encryption_table(shift1, shift2):
+    """
+    Build the letter map for a key pair once. Returns (text_table, bytes_table)
+    for use with str.translate and bytes.translate respectively.
+    """
+    letters = string.ascii_letters
+    encrypted = encrypt_text_reference(letters, shift1, shift2)
+    return str.maketrans(letters, encrypted), bytes.maketrans(letters.encode(), encrypted.encode())
+
+
+DecryptionTables = namedtuple("DecryptionTables", "text_table bytes_table collisions pattern")
+
+
+@lru_cache(maxsize=128)
+def decryption_tables(shift1, shift2):
+    """
+    Build the inverse letter map for a key pair once.
+
+    Letters with a single pre-image go into the translate tables; letters with
+    two pre-images are listed in `collisions` as {char: (option1, option2)} and
+    matched by `pattern` so they can be resolved separately.
+    """
+    table = {}
+    collisions = {}
+    for base, shift_low, shift_high in (('a', shift1 * shift2, -(shift1 + shift2)),
+                                            ('A', -shift1, shift2**2)):
+        for offset in range(26):
+            char = chr(ord(base) + offset)
+            # Same pre-images and choice rule as decrypt_text_reference
+            option1 = chr((offset - shift_low) % 26 + ord(base))
+            option2 = chr((offset - shift_high) % 26 + ord(base))
+            if option1 < chr(ord(base) + 13) and option2 >= chr(ord(base) + 13):
+                collisions[char] = (option1, option2)
+            elif option1 < chr(ord(base) + 13):
+                table[char] = option1
+            else:
+                table[char] = option2
+
+    keys = ''.join(table)
+    values = ''.join(table.values())
+    pattern = None
+    if collisions:
+        pattern = re.compile('([' + ''.join(collisions) + '])')
+    return DecryptionTables(str.maketrans(keys, values),
+                            bytes.maketrans(keys.encode(), values.encode()),
+                            collisions, pattern)
+
+
+def encrypt_text(text, shift1, shift2, backend="translate"):
+    """
+    Encrypt a string. The default "translate" backend applies a cached
+    translation table; "reference" uses the per-character loop.
+    """
+    if backend == "reference":
+        return encrypt_text_reference(text, shift1, shift2)
+    text_table, _ = encryption_table(shift1, shift2)
+    return text.translate(text_table)
+
+
+def encrypt_bytes(data, shift1, shift2):
+    """
+    Encrypt UTF-8 (or ASCII) bytes with the cached bytes table. Multi-byte
+    UTF-8 sequences never contain ASCII letters, so they pass through intact.
+    """
+    _, bytes_table = encryption_table(shift1, shift2)
+    return data.translate(bytes_table)
+
+
+def decrypt_text(text, shift1, shift2, on_collision=None, backend="translate", resolver=None):
+    """
+    Decrypt a string produced by `encrypt_text`.
+
+    The "translate" backend maps unambiguous letters with a precomputed inverse
+    table and only visits collision letters individually. Collisions are
+    resolved with the same random calls, in the same order, as the
+    "reference" backend, so both give identical output for the same seed.
+    Passing a `CollisionResolver` resolves collisions a whole word at a time
+    instead (see `NgramResolver`).
+    Returns: (decrypted_string, collision_count)
+    """
+    if backend == "reference":
+        return decrypt_text_reference(text, shift1, shift2, on_collision)
+
+    tables = decryption_tables(shift1, shift2)
+    if tables.pattern is None:
+        return text.translate(tables.text_table), 0
+    if resolver is not None:
+        return _decrypt_words(text, tables, resolver, on_collision)
+
+    # Splitting on a capturing group leaves collision letters at the odd indices
+    parts = tables.pattern.split(text)
+    for i in range(0, len(parts), 2):
+        parts[i] = parts[i].translate(tables.text_table)
+    for i in range(1, len(parts), 2):
+        char = parts[i]
+        option1, option2 = tables.collisions[char]
+        chosen = option1 if random.randint(1, 2) == 1 else option2
+        parts[i] = chosen
+        if on_collision is not None:
+            on_collision(char, option1, option2, chosen)
+    return ''.join(parts), len(parts) // 2
+
+
+def check_backends(shift_pairs=None, text=None, seed=0):
+    """
+    Check that the translate and reference backends give identical output.
+    Covers every shift pair in `shift_pairs` (default: all pairs in -30..30,
+    plus a few large ones). Raises AssertionError on the first difference and
+    returns the number of pairs checked.
+    """
+    if shift_pairs is None:
+        shift_pairs = [(a, b) for a in range(-30, 31) for b in range(-30, 31)]
+        shift_pairs += [(1000, 7), (-999, 12345), (26, 26), (52, -78)]
+    if text is None:
+        text = string.printable + "Ünïcödé text, ß and 漢字.\n" + string.ascii_letters * 3
+
+    for shift1, shift2 in shift_pairs:
+        expected = encrypt_text(text, shift1, shift2, backend="reference")
+        actual = encrypt_text(text, shift1, shift2)
+        # Explicit raises rather than assert, so the check still runs under `python -O`
+        if actual != expected:
+            raise AssertionError(f"encrypt mismatch for shifts ({shift1}, {shift2})")
+        if encrypt_bytes(text.encode(), shift1, shift2) != expected.encode():
+            raise AssertionError(f"encrypt_bytes mismatch for shifts ({shift1}, {shift2})")
+
+        random.seed(seed)
+        expected = decrypt_text(expected, shift1, shift2, backend="reference")
+        random.seed(seed)
+        actual = decrypt_text(actual, shift1, shift2)
+        if actual != expected:
+            raise AssertionError(f"decrypt mismatch for shifts ({shift1}, {shift2})")
+    return len(shift_pairs)
+
+
+WORD_PATTERN = re.compile('[A-Za-z]+')
+TRAILING_WORD_PATTERN = re.compile('[A-Za-z]+$')
+
+
+def _decrypt_words(text, tables, resolver, on_collision):
+    """
+    Decrypt `text` word by word, handing the candidates of every word that
+    contains a collision letter to `resolver`. Runs in time linear in the text.
+    """
+    parts = []
+    collision_count = 0
+    last = 0
+    for match in WORD_PATTERN.finditer(text):
+        parts.append(text[last:match.start()])
+        last = match.end()
+        word = match.group()
+        if tables.pattern.search(word) is None:
+            parts.append(word.translate(tables.text_table))
+            continue
+
+        candidates = [tables.collisions[char] if char in tables.collisions
+                      else (char.translate(tables.text_table),)
+                      for char in word]
+        chosen = resolver.resolve_word(candidates)
+        for char, options, picked in zip(word, candidates, chosen):
+            if len(options) == 2:
+                collision_count += 1
+                if on_collision is not None:
+                    on_collision(char, options[0], options[1], picked)
+        parts.append(chosen)
+    parts.append(text[last:])
+    return ''.join(parts), collision_count
+
+
+class CollisionResolver(ABC):
+    """
+    Interface for choosing between collision candidates.
+
+    `resolve_word` receives one tuple per letter of an encrypted word: a
+    1-tuple for unambiguous letters and (option1, option2) for collisions.
+    It returns the decrypted word as a string.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def resolve_word(self, candidates):
+        """Return the decrypted word for one tuple of candidates per letter."""
+
+
+class RandomResolver(CollisionResolver):
+    """Coin flip per collision, the assignment's original behaviour."""
+
+    name = "random"
+
+    def resolve_word(self, candidates):
+        return ''.join(options[0] if len(options) == 1 or random.randint(1, 2) == 1 else options[1]
+                       for options in candidates)
+
+
+class VowelBiasResolver(CollisionResolver):
+    """Apply `choose_with_vowel_bias` to each collision independently."""
+
+    name = "vowel"
+
+    def resolve_word(self, candidates):
+        return ''.join(options[0] if len(options) == 1 else choose_with_vowel_bias(*options)
+                       for options in candidates)
+
+
+class NgramModel:
+    """
+    Letter n-gram model (bigram or trigram) with add-k smoothing.
+
+    Words are lower-cased and padded with '^' at the start and '$' at the end,
+    so the model also learns which letters tend to begin and end words.
+    """
+
+    ALPHABET_SIZE = 27  # a-z plus the end-of-word marker
+
+    def __init__(self, order=3, k=0.1):
+        if order not in (2, 3):
+            raise ValueError("order must be 2 (bigram) or 3 (trigram)")
+        self.order = order
+        self.k = k
+        self.counts = {}  # context -> {next letter: count}
+        self.totals = {}  # context -> total count
+        self._log_probs = {}
+
+    def add_word(self, word):
+        padded = '^' * (self.order - 1) + word.lower() + '$'
+        for i in range(self.order - 1, len(padded)):
+            context = padded[i - self.order + 1:i]
+            following = self.counts.setdefault(context, {})
+            following[padded[i]] = following.get(padded[i], 0) + 1
+            self.totals[context] = self.totals.get(context, 0) + 1
+        self._log_probs.clear()
+
+    def log_prob(self, context, letter):
+        key = context + letter
+        value = self._log_probs.get(key)
+        if value is None:
+            count = self.counts.get(context, {}).get(letter, 0)
+            total = self.totals.get(context, 0)
+            value = math.log((count + self.k) / (total + self.k * self.ALPHABET_SIZE))
+            self._log_probs[key] = value
+        return value
+
+    @classmethod
+    def train(cls, corpus_path, order=3, k=0.1, chunk_size=CHUNK_SIZE):
+        """Train on a local text file, read in chunks so large corpora are fine."""
+        model = cls(order, k)
+        tail = ''
+        with open(corpus_path, 'r', encoding='utf-8', errors='ignore') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                words = WORD_PATTERN.findall(tail + chunk)
+                # The last word may continue in the next chunk
+                tail = words.pop() if words and chunk[-1].isalpha() else ''
+                for word in words:
+                    model.add_word(word)
+        if tail:
+            model.add_word(tail)
+        return model
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"order": self.order, "k": self.k, "counts": self.counts}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        model = cls(data["order"], data["k"])
+        model.counts = data["counts"]
+        model.totals = {context: sum(following.values()) for context, following in model.counts.items()}
+        return model
+
+
+class NgramResolver(CollisionResolver):
+    """
+    Viterbi decode of each word under an `NgramModel`.
+
+    The state is the last (order - 1) letters, and each position has at most
+    two candidates, so there are at most 4 states per position and the
+    decode is linear in the word length.
+    """
+
+    name = "ngram"
+
+    def __init__(self, model):
+        self.model = model
+
+    def resolve_word(self, candidates):
+        history = self.model.order - 1
+        # state (last letters, lower-case) -> (score, decoded word so far)
+        states = {'^' * history: (0.0, '')}
+        for options in candidates:
+            next_states = {}
+            for context, (score, decoded) in states.items():
+                for option in options:
+                    new_score = score + self.model.log_prob(context, option.lower())
+                    new_context = (context + option.lower())[-history:]
+                    best = next_states.get(new_context)
+                    if best is None or new_score > best[0]:
+                        next_states[new_context] = (new_score, decoded + option)
+            states = next_states
+
+        best_score, best_word = None, ''
+        for context, (score, decoded) in states.items():
+            score += self.model.log_prob(context, '$')
+            if best_score is None or score > best_score:
+                best_score, best_word = score, decoded
+        return best_word
+
+
+def benchmark_resolvers(text, shift1, shift2, resolvers, seed=0):
+    """
+    Encrypt `text`, decrypt it with each resolver and report accuracy
+    (mismatched characters against the original) and throughput.
+    Returns {resolver name: (mismatches, collisions, seconds)}.
+    """
+    encrypted = encrypt_text(text, shift1, shift2)
+    results = {}
+    print(f"{'resolver':<10}{'collisions':>12}{'mismatches':>12}{'accuracy':>10}{'chars/s':>14}")
+    for resolver in resolvers:
+        random.seed(seed)
+        start = time.perf_counter()
+        decrypted, collisions = decrypt_text(encrypted, shift1, shift2, resolver=resolver)
+        elapsed = time.perf_counter() - start
+        mismatches = sum(1 for a, b in zip(text, decrypted) if a != b)
+        accuracy = 1 - mismatches / collisions if collisions else 1.0
+        rate = len(text) / elapsed if elapsed else float('inf')
+        print(f"{resolver.name:<10}{collisions:>12}{mismatches:>12}{accuracy:>10.1%}{rate:>14,.0f}")
+        results[resolver.name] = (mismatches, collisions, elapsed)
+    return results
+
+
+def encrypt_file(shift1, shift2, input_path='raw_text.txt',
+                 output_path='encrypted_text.txt', echo=True):
+    """
+    Encrypt the contents of `input_path` following the assignment rules and
+    write the result to `output_path`. The whole file is held in memory; use
+    `encrypt_stream` for large inputs.
+    Returns the encrypted string.
+    """
+    with open(input_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    encrypted_str = encrypt_text(content, shift1, shift2)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(encrypted_str)
+
+    if echo:
+        print("Encrypted content:")
+        print(encrypted_str)
+    return encrypted_str
+
+
+def decrypt_file(shift1, shift2, input_path='encrypted_text.txt',
+                 output_path='decrypted_text.txt', echo=True, resolver=None):
+    """
+    Attempt to decrypt `input_path` and write the reconstructed text to
+    `output_path`. Prints up to MAX_PRINT collision messages and then
+    summarizes the remaining ones. The whole file is held in memory; use
+    `decrypt_stream` for large inputs.
+    Returns: (decrypted_string, collision_count)
+    """
+    with open(input_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    reporter = CollisionReporter()
+    decrypted_str, collision_count = decrypt_text(content, shift1, shift2, reporter,
+                                                  resolver=resolver)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(decrypted_str)
+
+    reporter.summary(collision_count)
+
+    if echo:
+        print(f"\nDecrypted content (had {collision_count} collisions):")
+        print(decrypted_str)
+    return decrypted_str, collision_count
+
+
+def encrypt_stream(shift1, shift2, input_path, output_path,
+                   chunk_size=CHUNK_SIZE, echo=False):
+    """
+    Encrypt `input_path` into `output_path` one chunk at a time, so memory
+    use is bounded by `chunk_size` regardless of the file size.
+    Returns the number of characters processed.
+    """
+    total = 0
+    with open(input_path, 'r', encoding='utf-8', newline='') as src, \
+         open(output_path, 'w', encoding='utf-8', newline='') as dst:
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                break
+            encrypted = encrypt_text(chunk, shift1, shift2)
+            dst.write(encrypted)
+            if echo:
+                sys.stdout.write(encrypted)
+            total += len(chunk)
+    if echo:
+        print()
+    return total
+
+
+def decrypt_stream(shift1, shift2, input_path, output_path,
+                   chunk_size=CHUNK_SIZE, echo=False, resolver=None):
+    """
+    Decrypt `input_path` into `output_path` one chunk at a time. Collisions
+    are reported the same way as in `decrypt_file`.
+    Returns: (characters_processed, collision_count)
+    """
+    total = 0
+    collision_count = 0
+    reporter = CollisionReporter()
+    pending = ''
+    with open(input_path, 'r', encoding='utf-8', newline='') as src, \
+         open(output_path, 'w', encoding='utf-8', newline='') as dst:
+        while True:
+            chunk = src.read(chunk_size)
+            at_end = not chunk
+            if at_end and not pending:
+                break
+            total += len(chunk)
+            chunk, pending = pending + chunk, ''
+            if resolver is not None and not at_end:
+                # Word resolvers need whole words: carry a trailing partial word over
+                tail = TRAILING_WORD_PATTERN.search(chunk)
+                if tail and tail.start() > 0:
+                    chunk, pending = chunk[:tail.start()], chunk[tail.start():]
+            decrypted, collisions = decrypt_text(chunk, shift1, shift2, reporter,
+                                                 resolver=resolver)
+            dst.write(decrypted)
+            if echo:
+                sys.stdout.write(decrypted)
+            collision_count += collisions
+    if echo:
+        print()
+    reporter.summary(collision_count)
+    return total, collision_count
+
+
+RANGE_SIZE = 64 * CHUNK_SIZE  # bytes per work item in batch mode
+
+
+def split_ranges(path, range_size=RANGE_SIZE):
+    """
+    Split a file into (start, end) byte ranges of roughly `range_size` bytes.
+    Each range ends just after an ASCII whitespace byte, so no word or UTF-8
+    sequence is cut in half and ranges can be decrypted independently.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, 'rb') as f:
+        while start < size:
+            end = min(start + range_size, size)
+            f.seek(end)
+            while end < size:
+                window = f.read(4096)
+                if not window:
+                    end = size
+                    break
+                cut = next((i for i, byte in enumerate(window) if byte in b" \t\r\n\f\v"), None)
+                if cut is not None:
+                    end += cut + 1
+                    break
+                end += len(window)
+            ranges.append((start, min(end, size)))
+            start = ranges[-1][1]
+    return ranges
+
+
+def _process_range(mode, shift1, shift2, src_path, dst_path, start, end, seed, resolver):
+    """Worker: transform one byte range of `src_path` in place into the pre-sized `dst_path`."""
+    with open(src_path, 'rb') as src:
+        src.seek(start)
+        data = src.read(end - start)
+
+    collisions = 0
+    if mode == "encrypt":
+        result = encrypt_bytes(data, shift1, shift2)
+    else:
+        if seed is not None:
+            random.seed(seed)
+        text, collisions = decrypt_text(data.decode('utf-8'), shift1, shift2, resolver=resolver)
+        result = text.encode('utf-8')
+
+    with open(dst_path, 'r+b') as dst:
+        dst.seek(start)
+        dst.write(result)
+    return collisions
+
+
+def collect_inputs(paths):
+    """Expand directories in `paths` into the regular files they contain."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(entry.path for entry in os.scandir(path) if entry.is_file()))
+        else:
+            files.append(path)
+    return files
+
+
+def output_names(files):
+    """
+    Give every input a unique output stem: its path relative to the directory
+    that contains all inputs, so d1/x.txt and d2/x.txt stay apart. Raises
+    ValueError if two inputs would still share outputs (the same file listed twice).
+    """
+    if not files:
+        return {}
+    absolute = [os.path.abspath(path) for path in files]
+    root = os.path.commonpath([os.path.dirname(path) for path in absolute])
+    names, owners = {}, {}
+    for path, full in zip(files, absolute):
+        name = os.path.relpath(full, root)
+        key = os.path.normcase(name)
+        if key in owners:
+            raise ValueError(f"{owners[key]} and {path} would both be written to {name}.enc/.dec")
+        owners[key] = path
+        names[path] = name
+    return names
+
+
+def run_batch(paths, shift1, shift2, output_dir, workers=None, range_size=RANGE_SIZE,
+              seed=None, resolver=None):
+    """
+    Encrypt, decrypt and verify many (possibly large) files on all cores.
+
+    Every input is split into whitespace-aligned byte ranges that are handed
+    to a ProcessPoolExecutor. Workers write their range straight into output
+    files that were pre-sized to the input size, so nothing is concatenated in
+    memory. Outputs go to `output_dir` as <name>.enc and <name>.dec, where
+    <name> is the input's path relative to the inputs' common directory.
+    Returns {input path: collision count}, and prints a combined report with
+    the verification mismatch count of every file.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    files = collect_inputs(paths)
+    names = output_names(files)  # Checked for collisions before any output is touched
+    jobs = []
+    for path in files:
+        encrypted = os.path.join(output_dir, names[path] + ".enc")
+        decrypted = os.path.join(output_dir, names[path] + ".dec")
+        os.makedirs(os.path.dirname(encrypted), exist_ok=True)
+        size = os.path.getsize(path)
+        for out_path in (encrypted, decrypted):
+            with open(out_path, 'wb') as f:
+                f.truncate(size)
+        jobs.append((path, encrypted, decrypted, split_ranges(path, range_size)))
+
+    collisions = {path: 0 for path in files}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # The ciphertext must be complete before any range is decrypted
+        futures = [pool.submit(_process_range, "encrypt", shift1, shift2, path, encrypted,
+                               start, end, None, None)
+                   for path, encrypted, _, ranges in jobs for start, end in ranges]
+        for future in futures:
+            future.result()
+
+        futures = []
+        for path, encrypted, decrypted, ranges in jobs:
+            for start, end in ranges:
+                range_seed = None if seed is None else seed + len(futures)
+                futures.append((path, pool.submit(_process_range, "decrypt", shift1, shift2,
+                                                  encrypted, decrypted, start, end,
+                                                  range_seed, resolver)))
+        for path, future in futures:
+            collisions[path] += future.result()
+
+    print(f"{'file':<40}{'collisions':>12}{'mismatches':>12}")
+    total_mismatches = 0
+    for path, _, decrypted, _ in jobs:
+        mismatches = compare_files(path, decrypted).mismatch_count
+        total_mismatches += mismatches
+        print(f"{names[path]:<40}{collisions[path]:>12}{mismatches:>12}")
+    print(f"Total: {len(files)} files, {sum(collisions.values())} collisions, "
+          f"{total_mismatches} mismatches")
+    return collisions
+
+
+NumpyDecryptResult = namedtuple("NumpyDecryptResult", "collision_count positions chosen")
+
+
+def decrypt_file_numpy(shift1, shift2, input_path='encrypted_text.txt',
+                       output_path='decrypted_text.txt', seed=None, policy="random",
+                       block_size=64 * CHUNK_SIZE, collect_positions=False):
+    """
+    Decrypt `input_path` with NumPy, working on the file as a memory-mapped
+    uint8 array in blocks of `block_size` bytes.
+
+    Every position is looked up in 256-entry tables at once: unambiguous
+    letters go through the inverse table, and collision positions get both
+    candidate pre-images. Collisions are resolved in bulk with a seeded
+    generator, so the same seed always gives the same output:
+      - policy="random": pick either option with equal probability
+      - policy="vowel": the `choose_with_vowel_bias` rule applied to all
+        collisions at once (random fallback drawn from the same generator)
+
+    Returns NumpyDecryptResult(collision_count, positions, chosen). With
+    collect_positions=True, `positions` are the byte offsets of the collisions
+    and `chosen` the bytes written there; this costs about 9 bytes per
+    collision, so by default only the count is kept and both are None.
+    """
+    import numpy as np
+
+    if policy not in ("random", "vowel"):
+        raise ValueError(f"Unknown collision policy: {policy}")
+
+    tables = decryption_tables(shift1, shift2)
+    inverse = np.frombuffer(tables.bytes_table, dtype=np.uint8)
+    is_collision = np.zeros(256, dtype=bool)
+    option1_table = np.zeros(256, dtype=np.uint8)
+    option2_table = np.zeros(256, dtype=np.uint8)
+    for char, (option1, option2) in tables.collisions.items():
+        is_collision[ord(char)] = True
+        option1_table[ord(char)] = ord(option1)
+        option2_table[ord(char)] = ord(option2)
+    is_vowel = np.zeros(256, dtype=bool)
+    is_vowel[np.frombuffer(b"aeiouAEIOU", dtype=np.uint8)] = True
+
+    rng = np.random.default_rng(seed)
+    size = os.path.getsize(input_path)
+    data = np.memmap(input_path, dtype=np.uint8, mode='r') if size else np.empty(0, dtype=np.uint8)
+    collision_count = 0
+    positions = []
+    chosen = []
+
+    with open(output_path, 'wb') as out:
+        for start in range(0, size, block_size):
+            block = data[start:start + block_size]
+            decrypted = inverse[block]
+            hits = np.flatnonzero(is_collision[block])
+            if hits.size:
+                encrypted = block[hits]
+                option1 = option1_table[encrypted]
+                option2 = option2_table[encrypted]
+                take_first = rng.random(hits.size) < 0.5
+                if policy == "vowel":
+                    vowel1 = is_vowel[option1]
+                    vowel2 = is_vowel[option2]
+                    take_first = np.where(vowel1 != vowel2, vowel1, take_first)
+                picks = np.where(take_first, option1, option2)
+                decrypted[hits] = picks
+                collision_count += int(hits.size)
+                if collect_positions:
+                    positions.append(hits + start)
+                    chosen.append(picks)
+            decrypted.tofile(out)
+
+    if not collect_positions:
+        return NumpyDecryptResult(collision_count, None, None)
+    if positions:
+        positions = np.concatenate(positions)
+        chosen = np.concatenate(chosen)
+    else:
+        positions = np.empty(0, dtype=np.intp)
+        chosen = np.empty(0, dtype=np.uint8)
+    return NumpyDecryptResult(collision_count, positions, chosen)
+
+
+VerifyResult = namedtuple("VerifyResult", "match mismatch_count first_offset runs")
+
+VERIFY_BLOCK = CHUNK_SIZE  # bytes compared per block in verification
+VERIFY_SUB_BLOCK = 64  # bytes per sub-block when locating mismatches inside a block
+
+
+def _map_file(f):
+    """Memory-map an open binary file; empty files cannot be mapped, so use b''."""
+    if os.fstat(f.fileno()).st_size == 0:
+        return b''
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def compare_files(original_path, decrypted_path, quick=False, index_path=None,
+                  collect_runs=False, block_size=VERIFY_BLOCK):
+    """
+    Compare two files through memory maps, block by block, in constant memory.
+
+    Equal blocks are skipped with a single memcmp-style comparison. With
+    `quick=True` the scan stops at the first differing byte. Otherwise every
+    mismatched byte is counted and grouped into runs of consecutive
+    mismatches, which are written to `index_path` as "offset,length" lines
+    and/or returned in `runs` when `collect_runs` is set. Bytes past the end
+    of the shorter file count as one final mismatch run.
+
+    Returns VerifyResult(match, mismatch_count, first_offset, runs);
+    mismatch_count is None for quick comparisons that found a difference.
+    """
+    runs = [] if collect_runs else None
+    index = open(index_path, 'w', encoding='utf-8') if index_path else None
+    mismatch_count = 0
+    first_offset = None
+    run_start = run_end = None
+
+    def flush_run():
+        if run_start is None:
+            return
+        if runs is not None:
+            runs.append((run_start, run_end - run_start))
+        if index is not None:
+            index.write(f"{run_start},{run_end - run_start}\n")
+
+    try:
+        with open(original_path, 'rb') as f1, open(decrypted_path, 'rb') as f2:
+            original = _map_file(f1)
+            decrypted = _map_file(f2)
+            common = min(len(original), len(decrypted))
+
+            for start in range(0, common, block_size):
+                end = min(start + block_size, common)
+                if original[start:end] == decrypted[start:end]:
+                    continue
+                for sub in range(start, end, VERIFY_SUB_BLOCK):
+                    a = original[sub:min(sub + VERIFY_SUB_BLOCK, end)]
+                    b = decrypted[sub:min(sub + VERIFY_SUB_BLOCK, end)]
+                    if a == b:
+                        continue
+                    for offset, (x, y) in enumerate(zip(a, b), sub):
+                        if x == y:
+                            continue
+                        if first_offset is None:
+                            first_offset = offset
+                            if quick:
+                                return VerifyResult(False, None, first_offset, runs)
+                        mismatch_count += 1
+                        if run_end == offset:
+                            run_end += 1
+                        else:
+                            flush_run()
+                            run_start, run_end = offset, offset + 1
+
+            if len(original) != len(decrypted):
+                if first_offset is None:
+                    first_offset = common
+                if quick:
+                    return VerifyResult(False, None, first_offset, runs)
+                extra = abs(len(original) - len(decrypted))
+                mismatch_count += extra
+                if run_end == common:
+                    run_end += extra
+                else:
+                    flush_run()
+                    run_start, run_end = common, common + extra
+            flush_run()
+    finally:
+        if index is not None:
+            index.close()
+
+    return VerifyResult(mismatch_count == 0, mismatch_count, first_offset, runs)
+
+
+def _excerpt(path, offset, width=10):
+    """
+    About `width` bytes either side of byte `offset`, widened to whole UTF-8
+    characters so a multi-byte character is never cut in half.
+    """
+    start = max(0, offset - width)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(2 * width + 3)  # up to 3 continuation bytes past the end
+    head = 0
+    while head < min(3, len(data)) and data[head] & 0xC0 == 0x80:
+        head += 1  # started inside a character: skip to its end
+    end = min(len(data), head + 2 * width)
+    while end < len(data) and data[end] & 0xC0 == 0x80:
+        end += 1  # ends inside a character: finish it
+    return data[head:end].decode('utf-8', errors='replace')
+
+
+def verify_files(original_path='raw_text.txt', decrypted_path='decrypted_text.txt',
+                 quick=False, index_path=None, quiet=False):
+    """
+    Compare `original_path` and `decrypted_path` (see `compare_files`).
+    Prints the number of mismatched bytes and the byte offset and excerpt of
+    the first mismatch if the files differ; `quick=True` only looks for the first difference.
+    Returns True if they match exactly, False otherwise.
+    """
+    result = compare_files(original_path, decrypted_path, quick=quick, index_path=index_path)
+    if quiet:
+        return result.match
+
+    if result.match:
+        print("✅ Perfect match! No errors in decryption.")
+        return True
+
+    print("❌ Decryption has errors due to collisions.")
+    if result.mismatch_count is not None:
+        print(f"{result.mismatch_count} mismatched bytes.")
+    print(f"First difference at byte offset {result.first_offset}:")
+    print(f"Original: ...{_excerpt(original_path, result.first_offset)}...")
+    print(f"Decrypted: ...{_excerpt(decrypted_path, result.first_offset)}...")
+    return False
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Encrypt, decrypt and verify a text file.")
+    parser.add_argument("--shift1", type=int, help="first shift value (prompted if omitted)")
+    parser.add_argument("--shift2", type=int, help="second shift value (prompted if omitted)")
+    parser.add_argument("--input", default="raw_text.txt", help="plain text file to encrypt")
+    parser.add_argument("--encrypted", default="encrypted_text.txt", help="where to write the encrypted text")
+    parser.add_argument("--decrypted", default="decrypted_text.txt", help="where to write the decrypted text")
+    parser.add_argument("--stream", action="store_true",
+                        help="process the files in chunks instead of reading them whole")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="characters per chunk in streaming mode")
+    parser.add_argument("--numpy", action="store_true",
+                        help="decrypt with the vectorised NumPy path")
+    parser.add_argument("--seed", type=int, help="seed for collision resolution in NumPy mode")
+    parser.add_argument("--policy", choices=["random", "vowel"], default="random",
+                        help="collision policy in NumPy mode")
+    parser.add_argument("--resolver", choices=["random", "vowel", "ngram"], default="random",
+                        help="how collisions are resolved (ngram needs --model)")
+    parser.add_argument("--model", default="ngram_model.json", help="n-gram model file")
+    parser.add_argument("--train-model", metavar="CORPUS",
+                        help="train an n-gram model on CORPUS, save it to --model and exit")
+    parser.add_argument("--order", type=int, choices=[2, 3], default=3,
+                        help="n-gram order when training")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compare the collision resolvers on --input and exit")
+    parser.add_argument("--batch", nargs="+", metavar="PATH",
+                        help="files or directories to process in parallel (skips --input)")
+    parser.add_argument("--out-dir", default="batch_output", help="output directory for --batch")
+    parser.add_argument("--workers", type=int, help="worker processes for --batch (default: all cores)")
+    parser.add_argument("--range-size", type=int, default=RANGE_SIZE,
+                        help="bytes per work item for --batch")
+    parser.add_argument("--mismatch-index", metavar="PATH",
+                        help="write every mismatch run (offset,length) found by verification to PATH")
+    parser.add_argument("--quiet", action="store_true", help="do not echo file contents to stdout")
+    parser.add_argument("--check-backends", action="store_true",
+                        help="check the translate backend against the reference implementation and exit")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.check_backends:
+        print(f"Translate and reference backends agree for {check_backends()} shift pairs.")
+        raise SystemExit(0)
+    if args.train_model:
+        NgramModel.train(args.train_model, order=args.order).save(args.model)
+        print(f"Saved {args.order}-gram model to {args.model}")
+        raise SystemExit(0)
+
+    resolver = None
+    if args.resolver == "vowel":
+        resolver = VowelBiasResolver()
+    elif args.resolver == "ngram":
+        resolver = NgramResolver(NgramModel.load(args.model))
+
+    try:
+        shift1 = args.shift1 if args.shift1 is not None else int(input("Enter shift1: "))
+        shift2 = args.shift2 if args.shift2 is not None else int(input("Enter shift2: "))
+    except ValueError:
+        print("Please enter valid integers")
+        raise SystemExit(1)
+
+    if args.benchmark:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            sample = f.read()
+        resolvers = [RandomResolver(), VowelBiasResolver()]
+        if os.path.exists(args.model):
+            resolvers.append(NgramResolver(NgramModel.load(args.model)))
+        benchmark_resolvers(sample, shift1, shift2, resolvers)
+        raise SystemExit(0)
+
+    if args.batch:
+        try:
+            run_batch(args.batch, shift1, shift2, args.out_dir, workers=args.workers,
+                      range_size=args.range_size, seed=args.seed, resolver=resolver)
+        except ValueError as e:
+            print(e)
+            raise SystemExit(1)
+        raise SystemExit(0)
+
+    # Run the full pipeline: encrypt -> decrypt -> verify
+    if args.numpy:
+        encrypt_stream(shift1, shift2, args.input, args.encrypted, chunk_size=args.chunk_size)
+        result = decrypt_file_numpy(shift1, shift2, args.encrypted, args.decrypted,
+                                    seed=args.seed, policy=args.policy)
+        collisions = result.collision_count
+    elif args.stream:
+        encrypt_stream(shift1, shift2, args.input, args.encrypted,
+                       chunk_size=args.chunk_size, echo=not args.quiet)
+        _, collisions = decrypt_stream(shift1, shift2, args.encrypted, args.decrypted,
+                                       chunk_size=args.chunk_size, echo=not args.quiet,
+                                       resolver=resolver)
+    else:
+        encrypt_file(shift1, shift2, args.input, args.encrypted, echo=not args.quiet)
+        decrypted, collisions = decrypt_file(shift1, shift2, args.encrypted, args.decrypted,
+                                             echo=not args.quiet, resolver=resolver)
+    success = verify_files(args.input, args.decrypted, index_path=args.mismatch_index)
+
+    if collisions > 0:
+        print(f"\nNote: There were {collisions} collisions during decryption.")
+        print("The decryption had to make guesses, which may not always be correct.")
+        print("This is a limitation of the encryption method specified in the assignment.")
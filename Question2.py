@@ -1,184 +1,735 @@
-#Question 2: Temperature Analysis
-
-'''
-Create a program that analyses temperature data collected from multiple weather 
-stations in Australia. The data is stored in multiple CSV files under a "temperatures" 
-folder, with each file representing data from one year. Process ALL .csv files in the 
-temperatures folder. Ignore missing temperature values (NaN) in calculations.
-'''
-
-#Import Temperature CSV Files and Operating Software for managing file paths.
-
-import csv
-import os
-
-#Prompt for folder path
-default_folder = "./temperatures/"
-folder = input(f"Enter the path to your temperatures folder [{default_folder}]: ") or default_folder
-
-#Get all CSV files in the folder
-csv_files = [os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".csv")]
-
-#Overall Temperature Analysis
-all_temperatures = [] #Create list of temperatures
-
-for filename in csv_files: #Begin loop of CSV Files
-    if not os.path.exists(filename): #Ensure File exists
-        print(f"File not found: {filename}")
-        continue
-
-    print(f"File Read: {filename}") 
-    try:
-        with open(filename, "r", encoding="utf-8") as file: #Read CSV File
-            reader = csv.reader(file)
-            header = next(reader)  #Ignore header row
-
-            for row in reader:
-                for value in row[4:]:  #Monthly temperatures (begin row 5)
-                    if value.lower() != "nan" and value.strip() != "": #Ignore Nan and blank values
-                        try:
-                            temp = float(value)
-                            all_temperatures.append(temp) #Add read Temperatures to All_temperatures list
-                        except ValueError:
-                            continue
-    except Exception as e:
-        print(f"Error read: {filename}: {e}") #For all exceptions create Error message
-
-if all_temperatures:
-    avg_temp = sum(all_temperatures) / len(all_temperatures)  #Measure Average temperature
-    max_temp = max(all_temperatures) #Measure Max temperature
-    min_temp = min(all_temperatures) #Measure Min temperature
-
-    print(f"Temperature Analysis (For Period 1986–2005):")
-    print(f"Average Temperature: {avg_temp:.2f}°C")
-    print(f"Max Temperature: {max_temp:.2f}°C")
-    print(f"Min Temperature: {min_temp:.2f}°C")
-    #Print Measurement Results
-else:
-    print("No valid temperature data found.")
-
-#Station Temperature Range Analysis
-
-station_temps = {}  #Ditionary: Station Name and Temperature
-station_ids = {} #Dictionary: Station Name and ID
-
-for filename in csv_files:  #Begin loop of CSV Files
-    if not os.path.exists(filename): #Ensure File exists
-        continue
-    with open(filename, "r", encoding="utf-8") as file: #Open file to read
-        reader = csv.reader(file) 
-        next(reader)
-        for row in reader: 
-            name = row[0] #Header
-            stn_id = row[1] #Station ID row
-            station_ids[name] = stn_id
-            for value in row[4:]: #Begin loop of Temperature values
-                if value.lower() != "nan" and value.strip() != "": #Ignore Nan and blank values
-                    try:
-                        temp = float(value) #Convert to float to accept decimal figures
-                        if name not in station_temps:
-                            station_temps[name] = [] #If not in dictionary create new list item and add to dictionary
-                        station_temps[name].append(temp)
-                    except ValueError:
-                        continue
-
-#Calculate range per Station
-
-station_ranges = {} #Dictionary for Sation range of temps
-for name, temps in station_temps.items(): #Loop through Stations and temperatures
-    if temps:
-        min_t = min(temps) #Smallest temp recorded
-        max_t = max(temps) #Largest temp recorded
-        range_t = max_t - min_t #Calculate range of temps
-        station_ranges[name] = (range_t, max_t, min_t) 
-
-#Sort stations by range descending
-sorted_stations = sorted(station_ranges.items(), key=lambda x: x[1][0], reverse=True)
-
-#Save to txt file with Station ID, range, max temp and min temp.
-with open("largest_temp_range_station.txt", "w") as out:
-    out.write(f"Total stations analyzed: {len(sorted_stations)}\n\n")
-    for name, (range_t, max_t, min_t) in sorted_stations:
-        stn_id = station_ids.get(name, "Unknown")
-        out.write(f"{name} (ID: {stn_id}): Range {range_t:.1f}°C (Max: {max_t:.1f}°C, Min: {min_t:.1f}°C)\n")
-
-#Dictionary of months according to rows in CSV Files
-season_names = {
-    "Summer": [15, 4, 5],
-    "Autumn": [6, 7, 8],
-    "Winter": [9, 10, 11],
-    "Spring": [12, 13, 14]
-}
-
-#Dictionary of Seasonal temperatures
-season_temps = {season: [] for season in season_names}
-
-for filename in csv_files: #loop through all CSV Files
-    if not os.path.exists(filename):
-        continue
-    with open(filename, "r", encoding="utf-8") as file:
-        reader = csv.reader(file)
-        next(reader)
-        for row in reader: #for each season, look at specified season columns
-            for season, indices in season_names.items():
-                for i in indices:
-                    if i < len(row):
-                        value = row[i]
-                        if value.lower() != "nan" and value.strip() != "":
-                            try:
-                                #Convert values to float and add to season temp list
-                                season_temps[season].append(float(value))
-                            except ValueError:
-                                continue
-
-#Save average seasonal temperatures to a text file
-with open("average_temp.txt", "w") as out:
-    for season, temps in season_temps.items():
-        if temps:
-            avg = sum(temps) / len(temps)  #Calculate average temps
-            out.write(f"{season}: {avg:.1f}°C\n")
-
-import math
-
-#Dictionary to create SD for each station
-station_SD = {}
-
-#Loop through all CSV to calculate SD
-for filename in csv_files:
-    if not os.path.exists(filename): #Skip if file missing
-        continue
-    with open(filename, "r", encoding="utf-8") as file:
-        reader = csv.reader(file)
-        next(reader)
-        for row in reader:
-            name = row[0] #Station name is in first column
-            temps = []
-            #Loop through temp values
-            for value in row[4:]:
-                if value.lower() != "nan" and value.strip() != "":
-                    try:
-                        temps.append(float(value)) #Convert temp values to float
-                    except ValueError:
-                        continue
-            if temps: #If station has temp data 
-                mean = sum(temps) / len(temps) #Calculate average temp 
-                variance = sum((t - mean) ** 2 for t in temps) / len(temps) #Calculate variance
-                SD = math.sqrt(variance) #Calculate SD
-                station_SD[name] = SD
-
-#Calculate minimum and maximum SD values
-min_std = min(station_SD.values())
-max_std = max(station_SD.values())
-
-#Calculate most and least stable stations
-most_stable = [name for name, std in station_SD.items() if std == min_std]
-most_variable = [name for name, std in station_SD.items() if std == max_std]
-
-#Save SD data to a txt file
-with open("temperature_stability_stations.txt", "w") as out:
-    for name in most_stable:
-        out.write(f"Most Stable: {name}: StdDev {min_std:.1f}°C\n")
-    for name in most_variable:
-        out.write(f"Most Variable: {name}: StdDev {max_std:.1f}°C\n")
-
-        
+#Question 2: Temperature Analysis
+
+'''
+Create a program that analyses temperature data collected from multiple weather
+stations in Australia. The data is stored in multiple CSV files under a "temperatures"
+folder, with each file representing data from one year. Process ALL .csv files in the
+temperatures folder. Ignore missing temperature values (NaN) in calculations.
+'''
+
+#Import Temperature CSV Files and Operating Software for managing file paths.
+
+import argparse
+import csv
+import heapq
+import json
+import math
+import os
+import re
+import time
+
+MONTHS = 12 #Monthly temperature columns per row
+FIRST_MONTH_COLUMN = 4 #Monthly temperatures begin at row[4]
+
+#Dictionary of months according to rows in CSV Files
+season_names = {
+    "Summer": [15, 4, 5],
+    "Autumn": [6, 7, 8],
+    "Winter": [9, 10, 11],
+    "Spring": [12, 13, 14]
+}
+
+
+def _to_float32(cells):
+    #Convert cell strings in one call; fall back to cell by cell only if a file has bad values
+    import numpy as np
+
+    try:
+        return np.array(cells, dtype=np.float32)
+    except ValueError:
+        values = []
+        for value in cells:
+            try:
+                values.append(float(value))
+            except ValueError:
+                values.append(math.nan) #Treat unreadable values like missing ones
+        return np.array(values, dtype=np.float32)
+
+
+def _month_cells(row):
+    #The 12 monthly cells of a row, padded with "nan"; blank values are missing
+    months = row[FIRST_MONTH_COLUMN:FIRST_MONTH_COLUMN + MONTHS]
+    months += ["nan"] * (MONTHS - len(months)) #Pad short rows
+    return [value.strip() or "nan" for value in months]
+
+
+def parse_csv(filename):
+    """
+    Parse one CSV file into (values, station_codes, station_names, station_ids),
+    with codes local to this file.
+    """
+    import numpy as np
+
+    cells = []
+    codes = []
+    names = {} #Station name -> local code
+    ids = {}
+    with open(filename, "r", encoding="utf-8") as file: #Read CSV File
+        reader = csv.reader(file)
+        next(reader, None) #Ignore header row
+        for row in reader:
+            if len(row) < 2: #Skip blank lines
+                continue
+            name = row[0]
+            ids[name] = row[1]
+            codes.append(names.setdefault(name, len(names)))
+            cells.extend(_month_cells(row))
+
+    values = _to_float32(cells).reshape(-1, MONTHS)
+    return values, np.array(codes, dtype=np.int32), list(names), ids
+
+
+CACHE_DIR_NAME = ".temperature_cache" #Created next to the CSV files
+
+
+def _cache_paths(filename):
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(filename)), CACHE_DIR_NAME)
+    base = os.path.join(cache_dir, os.path.basename(filename))
+    return cache_dir, base + ".values.npy", base + ".codes.npy", base + ".meta.json"
+
+
+def load_csv_cached(filename):
+    """
+    Like parse_csv, but keeps a binary copy of the parsed file in
+    CACHE_DIR_NAME keyed on path, size and mtime. Unchanged files are
+    memory-mapped from the cache instead of being parsed again.
+    """
+    import numpy as np
+
+    cache_dir, values_path, codes_path, meta_path = _cache_paths(filename)
+    stat = os.stat(filename)
+    key = {"path": os.path.abspath(filename), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["key"] == key:
+            values = np.load(values_path, mmap_mode="r")
+            codes = np.load(codes_path, mmap_mode="r")
+            return values, codes, meta["station_names"], meta["station_ids"], True
+    except (OSError, ValueError, KeyError):
+        pass #Missing or stale cache: parse the CSV again
+
+    values, codes, names, ids = parse_csv(filename)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.save(values_path, values)
+        np.save(codes_path, codes)
+        #Metadata is written last, so it only exists once the arrays are complete
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "station_names": names, "station_ids": ids}, f)
+    except OSError as e:
+        print(f"Could not cache {filename}: {e}")
+    return values, codes, names, ids, False
+
+
+def _station_groups(values, station_codes):
+    #Valid readings sorted by station so each station is one contiguous slice
+    import numpy as np
+
+    codes = np.repeat(station_codes, values.shape[1])
+    values = values.ravel()
+    valid = ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+    order = np.argsort(codes, kind="stable")
+    codes, values = codes[order], values[order].astype(np.float64)
+    present, starts = np.unique(codes, return_index=True)
+    counts = np.diff(np.append(starts, len(values)))
+    return present, starts, counts, values
+
+
+class RunningStats:
+    """
+    Running count, mean, M2 (sum of squared deviations), min and max of a
+    stream of readings. Single readings are added with Welford's update and
+    partial results are combined with Chan et al.'s parallel merge, so the
+    state stays a few numbers no matter how many readings it has seen.
+    """
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, min_t=math.inf, max_t=-math.inf):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min_t
+        self.max = max_t
+
+    @classmethod
+    def from_values(cls, values):
+        #Stats of a NumPy array of valid readings in one vectorised pass
+        import numpy as np
+
+        if len(values) == 0:
+            return cls()
+        values = np.asarray(values, dtype=np.float64)
+        mean = float(values.mean())
+        return cls(len(values), mean, float(((values - mean) ** 2).sum()),
+                   float(values.min()), float(values.max()))
+
+    def push(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def to_list(self):
+        return [self.count, self.mean, self.m2, self.min, self.max]
+
+    @property
+    def std(self):
+        #Population standard deviation
+        return math.sqrt(self.m2 / self.count) if self.count else math.nan
+
+
+def _group_stats(values, station_codes):
+    #(station code, RunningStats) for every station with readings in a block
+    import numpy as np
+
+    present, starts, counts, grouped = _station_groups(values, station_codes)
+    if grouped.size == 0:
+        return []
+    means = np.add.reduceat(grouped, starts) / counts
+    m2s = np.add.reduceat((grouped - np.repeat(means, counts)) ** 2, starts)
+    maxs = np.maximum.reduceat(grouped, starts)
+    mins = np.minimum.reduceat(grouped, starts)
+    return [(code, RunningStats(count, mean, m2, min_t, max_t))
+            for code, count, mean, m2, min_t, max_t in zip(present.tolist(), counts.tolist(), means.tolist(),
+                                                           m2s.tolist(), mins.tolist(), maxs.tolist())]
+
+
+class TemperatureAggregates:
+    """
+    Overall, per-station and per-season RunningStats. Memory depends on the
+    number of stations, not the number of readings, and aggregates built
+    from different files (or shards) can be merged. Station and season
+    tracking can be switched off when those reports are not needed.
+    """
+
+    def __init__(self, stations=True, seasons=True):
+        self.track_stations = stations
+        self.track_seasons = seasons
+        self.overall = RunningStats()
+        self.stations = {} #Station Name -> RunningStats
+        self.station_ids = {} #Dictionary: Station Name and ID
+        self.seasons = {season: RunningStats() for season in season_names} if seasons else {}
+        #Month column (0-11) -> season, used when streaming single readings
+        self._month_seasons = {i - FIRST_MONTH_COLUMN: season
+                               for season, indices in season_names.items() for i in indices}
+
+    def add_row(self, name, stn_id, months):
+        #Fold one CSV row (12 monthly values, NaN where missing) into the stats
+        station = None
+        if self.track_stations:
+            self.station_ids[name] = stn_id
+            station = self.stations.get(name)
+            if station is None:
+                station = self.stations[name] = RunningStats()
+        for month, value in enumerate(months):
+            if value != value: #NaN
+                continue
+            self.overall.push(value)
+            if station is not None:
+                station.push(value)
+            if self.track_seasons:
+                self.seasons[self._month_seasons[month]].push(value)
+
+    def add_block(self, values, station_codes, station_names, station_ids):
+        #Fold a parsed file (see parse_csv) in with vectorised per-station reductions
+        import numpy as np
+
+        valid = values[~np.isnan(values)]
+        self.overall.merge(RunningStats.from_values(valid))
+
+        if self.track_stations:
+            self._add_station_block(values, station_codes, station_names, station_ids)
+        if self.track_seasons:
+            for season, indices in season_names.items():
+                season_values = values[:, [i - FIRST_MONTH_COLUMN for i in indices]]
+                self.seasons[season].merge(RunningStats.from_values(season_values[~np.isnan(season_values)]))
+
+    def _add_station_block(self, values, station_codes, station_names, station_ids):
+        self.station_ids.update(station_ids)
+        for name in station_names:
+            self.stations.setdefault(name, RunningStats())
+        for code, stats in _group_stats(values, station_codes):
+            self.stations[station_names[code]].merge(stats)
+
+    def merge(self, other):
+        self.overall.merge(other.overall)
+        for name, stats in other.stations.items():
+            self.stations.setdefault(name, RunningStats()).merge(stats)
+        self.station_ids.update(other.station_ids)
+        for season, stats in other.seasons.items():
+            self.seasons.setdefault(season, RunningStats()).merge(stats)
+        return self
+
+    def to_dict(self):
+        #JSON-friendly copy of the state, see from_dict
+        return {"overall": self.overall.to_list(),
+                "stations": {name: stats.to_list() for name, stats in self.stations.items()},
+                "station_ids": self.station_ids,
+                "seasons": {season: stats.to_list() for season, stats in self.seasons.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregates = cls()
+        aggregates.overall = RunningStats(*data["overall"])
+        aggregates.stations = {name: RunningStats(*values) for name, values in data["stations"].items()}
+        aggregates.station_ids = data["station_ids"]
+        aggregates.seasons.update((season, RunningStats(*values)) for season, values in data["seasons"].items())
+        return aggregates
+
+    #Results in the shape the report writers expect
+
+    def overall_stats(self):
+        if self.overall.count == 0:
+            return None
+        return self.overall.mean, self.overall.max, self.overall.min
+
+    def station_ranges(self):
+        return {name: (stats.max - stats.min, stats.max, stats.min)
+                for name, stats in self.stations.items() if stats.count}
+
+    def seasonal_averages(self):
+        return {season: stats.mean for season, stats in self.seasons.items() if stats.count}
+
+    def station_std_devs(self):
+        return {name: stats.std for name, stats in self.stations.items() if stats.count}
+
+
+def aggregate_csv_rows(filename, aggregates):
+    #Stream one CSV row by row into the aggregates without building any arrays
+    with open(filename, "r", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        next(reader, None) #Ignore header row
+        for row in reader:
+            if len(row) < 2: #Skip blank lines
+                continue
+            #Parse as float32, like the cached path, so results don't depend on the cache flag
+            aggregates.add_row(row[0], row[1], _to_float32(_month_cells(row)).tolist())
+
+
+def _aggregate_one(filename, use_cache, stations=True, seasons=True):
+    #Worker: aggregates of a single file, plus the message to print for it
+    if not os.path.exists(filename): #Ensure File exists
+        return None, f"File not found: {filename}"
+    aggregates = TemperatureAggregates(stations, seasons)
+    try:
+        if use_cache:
+            values, codes, names, ids, cached = load_csv_cached(filename)
+            aggregates.add_block(values, codes, names, ids)
+        else:
+            cached = False
+            aggregate_csv_rows(filename, aggregates)
+    except Exception as e:
+        return None, f"Error read: {filename}: {e}" #For all exceptions create Error message
+    return aggregates, f"File Read: {filename}{' (cached)' if cached else ''}"
+
+
+def aggregate_files(csv_files, use_cache=True, workers=1, verbose=True, stations=True, seasons=True):
+    """
+    Build TemperatureAggregates one file at a time. With the cache each file
+    is folded in as a block; without it rows are streamed straight from the
+    CSV. With workers > 1 the files are aggregated in a process pool and the
+    partial aggregates are merged in file order, so results do not depend on
+    the worker count.
+    """
+    if workers > 1 and len(csv_files) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        count = len(csv_files)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(_aggregate_one, csv_files, [use_cache] * count,
+                                     [stations] * count, [seasons] * count))
+    else:
+        partials = (_aggregate_one(filename, use_cache, stations, seasons) for filename in csv_files)
+
+    aggregates = TemperatureAggregates(stations, seasons)
+    for partial, message in partials:
+        if verbose:
+            print(message)
+        if partial is not None:
+            aggregates.merge(partial)
+    return aggregates
+
+
+def file_year(filename):
+    #Year of a CSV file from the last 4-digit number in its name, or None
+    years = re.findall(r"\d{4}", os.path.basename(filename))
+    return int(years[-1]) if years else None
+
+
+def _summary(stats):
+    #Query result dictionary of a RunningStats, or None without readings
+    if stats.count == 0:
+        return None
+    return {"count": stats.count, "min": stats.min, "max": stats.max, "mean": stats.mean,
+            "stddev": stats.std, "range": stats.max - stats.min}
+
+
+class TemperatureIndex:
+    """
+    Index of the temperature archive for filtered queries.
+
+    Maps each station ID (row[1]) to the row offsets it occupies in every
+    year file, and each year to its files. Values stay in the .npy cache and
+    are memory-mapped on demand, so a query only touches the rows and
+    columns it selects.
+    """
+
+    def __init__(self, csv_files):
+        import numpy as np
+
+        self.files = [] #(year, filename) per indexed file
+        self.station_rows = {} #Station ID -> {file index: row offsets}
+        self.station_names = {} #Station ID -> Station Name
+        for filename in csv_files:
+            values, codes, names, ids, _ = load_csv_cached(filename)
+            file_index = len(self.files)
+            self.files.append((file_year(filename), filename))
+            #One sort per file: each station's rows become one contiguous run of `order`
+            order = np.argsort(np.asarray(codes), kind="stable")
+            present, starts = np.unique(np.asarray(codes)[order], return_index=True)
+            for code, rows in zip(present.tolist(), np.split(order, starts[1:])):
+                name = names[code]
+                stn_id = ids[name]
+                per_file = self.station_rows.setdefault(stn_id, {})
+                if file_index in per_file:
+                    rows = np.union1d(per_file[file_index], rows) #Two names sharing an ID
+                per_file[file_index] = rows
+                self.station_names[stn_id] = name
+
+    def _file_indices(self, years):
+        if years is None:
+            return range(len(self.files))
+        first, last = (years, years) if isinstance(years, int) else years
+        return [i for i, (year, _) in enumerate(self.files) if year is not None and first <= year <= last]
+
+    @staticmethod
+    def _columns(season):
+        if season is None:
+            return list(range(MONTHS))
+        return [i - FIRST_MONTH_COLUMN for i in season_names[season]]
+
+    def _values(self, file_index):
+        return load_csv_cached(self.files[file_index][1])[0]
+
+    def query(self, station=None, years=None, season=None):
+        """
+        Statistics of the readings matching every given filter:
+          - station: station ID
+          - years: a year or an inclusive (first, last) pair
+          - season: "Summer", "Autumn", "Winter" or "Spring"
+        Returns {"count", "min", "max", "mean", "stddev", "range"} or None.
+        """
+        import numpy as np
+
+        columns = self._columns(season)
+        stats = RunningStats()
+        for file_index in self._file_indices(years):
+            if station is None:
+                values = self._values(file_index)[:, columns]
+            else:
+                rows = self.station_rows.get(station, {}).get(file_index)
+                if rows is None:
+                    continue
+                values = self._values(file_index)[rows][:, columns]
+            stats.merge(RunningStats.from_values(values[~np.isnan(values)]))
+        return _summary(stats)
+
+    def top_stations(self, k=20, by="range", years=None, season=None):
+        """
+        The k stations with the largest `by` ("range", "max", "min", "mean"
+        or "stddev") over the selected years and season, largest first, as
+        [(station ID, station name, summary)]. Uses a heap instead of sorting
+        every station.
+        """
+        import numpy as np
+
+        columns = self._columns(season)
+        per_station = {}
+        for file_index in self._file_indices(years):
+            values, codes, names, ids, _ = load_csv_cached(self.files[file_index][1])
+            for code, stats in _group_stats(values[:, columns], np.asarray(codes)):
+                per_station.setdefault(ids[names[code]], RunningStats()).merge(stats)
+
+        summaries = ((stn_id, _summary(stats)) for stn_id, stats in per_station.items() if stats.count)
+        top = heapq.nlargest(k, summaries, key=lambda item: item[1][by])
+        return [(stn_id, self.station_names.get(stn_id, "Unknown"), summary) for stn_id, summary in top]
+
+
+def parse_years(text):
+    #"1990-1995" -> (1990, 1995), "1990" -> (1990, 1990)
+    first, _, last = text.partition("-")
+    return int(first), int(last or first)
+
+
+REPORTS = ("overall", "ranges", "seasons", "stability")
+DEFAULT_FOLDER = "./temperatures/"
+STATE_FILE_NAME = "temperature_state.json" #Saved in --output-dir unless --state says otherwise
+
+
+def find_csv_files(folder=DEFAULT_FOLDER):
+    #Get all CSV files in the folder
+    return sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".csv"))
+
+
+def _file_key(filename):
+    stat = os.stat(filename)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def save_state(path, aggregates, files):
+    #Persist the aggregates together with the files folded into them ({absolute path: size/mtime})
+    state = {"files": files, "aggregates": aggregates.to_dict()}
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as out:
+        json.dump(state, out)
+    os.replace(temporary, path) #Never leave a half-written state file behind
+
+
+def load_state(path):
+    #(aggregates, {absolute path: size/mtime}) from save_state, or empty ones without a state file
+    if not os.path.exists(path):
+        return TemperatureAggregates(), {}
+    with open(path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    return TemperatureAggregates.from_dict(state["aggregates"]), state["files"]
+
+
+def _results(aggregates, reports):
+    results = {}
+    if "overall" in reports:
+        results["overall"] = aggregates.overall_stats()
+    if "ranges" in reports:
+        results["ranges"] = aggregates.station_ranges()
+        results["station_ids"] = aggregates.station_ids
+    if "seasons" in reports:
+        results["seasons"] = aggregates.seasonal_averages()
+    if "stability" in reports:
+        results["stability"] = aggregates.station_std_devs()
+    return results
+
+
+def analyse(folder=DEFAULT_FOLDER, reports=REPORTS, use_cache=True, workers=1, verbose=True,
+            state_path=None):
+    """
+    Run the selected analyses over every CSV file in `folder` and return
+    {report: result}. Only the state the selected reports need is tracked:
+      - "overall": (average, max, min) or None
+      - "ranges": {station: (range, max, min)}, station IDs under "station_ids"
+      - "seasons": {season: average}
+      - "stability": {station: standard deviation}
+    When every report is selected and `state_path` is given, the aggregates
+    are saved there for later `append` runs.
+    """
+    csv_files = find_csv_files(folder)
+    stations = "ranges" in reports or "stability" in reports
+    aggregates = aggregate_files(csv_files, use_cache=use_cache, workers=workers,
+                                 verbose=verbose, stations=stations, seasons="seasons" in reports)
+    if state_path and stations and "seasons" in reports:
+        save_state(state_path, aggregates,
+                   {os.path.abspath(f): _file_key(f) for f in csv_files if os.path.exists(f)})
+    return _results(aggregates, reports)
+
+
+def append(folder=DEFAULT_FOLDER, state_path=STATE_FILE_NAME, reports=REPORTS,
+           use_cache=True, workers=1, verbose=True):
+    """
+    Fold only the CSV files that are not in the saved state into it, save
+    the state and return the results like `analyse`. Work grows with the new
+    data, not with the archive. Files that changed after being folded in
+    cannot be taken out again; they are reported and skipped, and need a
+    full run to be counted correctly.
+    """
+    aggregates, known = load_state(state_path)
+    new_files = []
+    for filename in find_csv_files(folder):
+        key = known.get(os.path.abspath(filename))
+        if key is None:
+            new_files.append(filename)
+        elif key != _file_key(filename):
+            print(f"Changed since it was added, run without --append to rebuild: {filename}")
+    if verbose:
+        print(f"Appending {len(new_files)} new file(s) to {state_path}")
+
+    if new_files:
+        aggregates.merge(aggregate_files(new_files, use_cache=use_cache, workers=workers, verbose=verbose))
+        for filename in new_files:
+            known[os.path.abspath(filename)] = _file_key(filename)
+        save_state(state_path, aggregates, known)
+    return _results(aggregates, reports)
+
+
+def write_reports(results, output_dir="."):
+    #Print or save every report present in the results of analyse()
+    if "overall" in results:
+        print_overall_stats(results["overall"])
+    if "ranges" in results:
+        write_station_ranges(results["ranges"], results["station_ids"],
+                             os.path.join(output_dir, "largest_temp_range_station.txt"))
+    if "seasons" in results:
+        write_seasonal_averages(results["seasons"], os.path.join(output_dir, "average_temp.txt"))
+    if "stability" in results:
+        write_stability(results["stability"], os.path.join(output_dir, "temperature_stability_stations.txt"))
+
+
+def benchmark_scaling(csv_files, max_workers=None, use_cache=True, repeats=3):
+    """
+    Time aggregate_files with 1..max_workers processes (best of `repeats`)
+    and print the speed-up over one worker.
+    Returns {workers: seconds}.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if use_cache:
+        aggregate_files(csv_files, verbose=False) #Warm the cache so every run measures the same work
+    timings = {}
+    print(f"{'workers':>8}{'seconds':>10}{'speed-up':>10}")
+    for workers in range(1, max_workers + 1):
+        best = math.inf
+        for _ in range(repeats):
+            start = time.perf_counter()
+            aggregate_files(csv_files, use_cache=use_cache, workers=workers, verbose=False)
+            best = min(best, time.perf_counter() - start)
+        timings[workers] = best
+        print(f"{workers:>8}{best:>10.3f}{timings[1] / best:>9.2f}x")
+    return timings
+
+
+def print_overall_stats(stats):
+    if stats:
+        avg_temp, max_temp, min_temp = stats
+        print(f"Temperature Analysis (For Period 1986–2005):")
+        print(f"Average Temperature: {avg_temp:.2f}°C")
+        print(f"Max Temperature: {max_temp:.2f}°C")
+        print(f"Min Temperature: {min_temp:.2f}°C")
+        #Print Measurement Results
+    else:
+        print("No valid temperature data found.")
+
+
+def write_station_ranges(ranges, station_ids, path="largest_temp_range_station.txt"):
+    #Sort stations by range descending
+    sorted_stations = sorted(ranges.items(), key=lambda x: x[1][0], reverse=True)
+
+    #Save to txt file with Station ID, range, max temp and min temp.
+    with open(path, "w") as out:
+        out.write(f"Total stations analyzed: {len(sorted_stations)}\n\n")
+        for name, (range_t, max_t, min_t) in sorted_stations:
+            stn_id = station_ids.get(name, "Unknown")
+            out.write(f"{name} (ID: {stn_id}): Range {range_t:.1f}°C (Max: {max_t:.1f}°C, Min: {min_t:.1f}°C)\n")
+
+
+def write_seasonal_averages(averages, path="average_temp.txt"):
+    #Save average seasonal temperatures to a text file
+    with open(path, "w") as out:
+        for season, avg in averages.items():
+            out.write(f"{season}: {avg:.1f}°C\n")
+
+
+def write_stability(station_SD, path="temperature_stability_stations.txt"):
+    if not station_SD:
+        return
+    #Calculate minimum and maximum SD values
+    min_std = min(station_SD.values())
+    max_std = max(station_SD.values())
+
+    #Calculate most and least stable stations
+    most_stable = [name for name, std in station_SD.items() if std == min_std]
+    most_variable = [name for name, std in station_SD.items() if std == max_std]
+
+    #Save SD data to a txt file
+    with open(path, "w") as out:
+        for name in most_stable:
+            out.write(f"Most Stable: {name}: StdDev {min_std:.1f}°C\n")
+        for name in most_variable:
+            out.write(f"Most Variable: {name}: StdDev {max_std:.1f}°C\n")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse the temperature CSV files of a folder.")
+    parser.add_argument("folder", nargs="?", default=DEFAULT_FOLDER,
+                        help=f"folder with the temperature CSV files (default: {DEFAULT_FOLDER})")
+    parser.add_argument("--reports", nargs="+", choices=REPORTS, default=list(REPORTS),
+                        help="reports to compute (default: all)")
+    parser.add_argument("--output-dir", default=".", help="where to write the report files")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes used to read the CSV files (default: 1)")
+    parser.add_argument("--no-cache", action="store_true", help="always parse the CSV files")
+    parser.add_argument("--quiet", action="store_true", help="do not list the files read")
+    parser.add_argument("--state",
+                        help="aggregate state file written by full runs and updated by --append "
+                             f"(default: {STATE_FILE_NAME} in --output-dir)")
+    parser.add_argument("--append", action="store_true",
+                        help="only fold CSV files not yet in --state into it, then write the reports")
+    parser.add_argument("--station", metavar="ID", help="query: only this station ID")
+    parser.add_argument("--years", type=parse_years, metavar="FIRST[-LAST]", help="query: only these years")
+    parser.add_argument("--season", choices=list(season_names), help="query: only this season")
+    parser.add_argument("--top", type=int, metavar="K", help="query: list the K stations with the largest --by")
+    parser.add_argument("--by", choices=["range", "max", "min", "mean", "stddev"], default="range",
+                        help="statistic used to rank stations for --top (default: range)")
+    parser.add_argument("--benchmark-scaling", action="store_true",
+                        help="time the analysis with 1..--workers processes instead of writing reports")
+    return parser.parse_args(argv)
+
+
+def _format_summary(summary):
+    if summary is None:
+        return "no readings"
+    return (f"{summary['count']} readings, Mean {summary['mean']:.2f}°C, Min {summary['min']:.1f}°C, "
+            f"Max {summary['max']:.1f}°C, Range {summary['range']:.1f}°C, StdDev {summary['stddev']:.2f}°C")
+
+
+def run_query(args):
+    #Answer a --station/--years/--season/--top query from the index instead of writing reports
+    index = TemperatureIndex(find_csv_files(args.folder))
+    if args.top:
+        for stn_id, name, summary in index.top_stations(args.top, args.by, args.years, args.season):
+            print(f"{name} (ID: {stn_id}): {_format_summary(summary)}")
+    else:
+        print(_format_summary(index.query(args.station, args.years, args.season)))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.benchmark_scaling:
+        benchmark_scaling(find_csv_files(args.folder), max_workers=args.workers, use_cache=not args.no_cache)
+        return
+
+    if args.station or args.years or args.season or args.top:
+        run_query(args)
+        return
+
+    state_path = args.state or os.path.join(args.output_dir, STATE_FILE_NAME)
+    if args.append:
+        results = append(args.folder, state_path, args.reports, use_cache=not args.no_cache,
+                         workers=args.workers, verbose=not args.quiet)
+    else:
+        results = analyse(args.folder, args.reports, use_cache=not args.no_cache,
+                          workers=args.workers, verbose=not args.quiet, state_path=state_path)
+    write_reports(results, args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
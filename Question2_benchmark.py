@@ -0,0 +1,166 @@
+#Question 2: Synthetic temperature archive and scaling benchmark
+
+'''
+Generate temperature archives in the layout Question2 expects (station name,
+station ID, two metadata columns, then 12 monthly columns with NaN/blank gaps)
+and measure how the analysis scales with the number of rows. Each phase runs in
+a fresh process so its peak memory is measured on its own.
+
+    python Question2_benchmark.py --max-rows 1e6 --json results.json
+'''
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import Question2
+
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June",
+               "July", "August", "September", "October", "November", "December"]
+DEFAULT_SCALES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+
+
+def generate_archive(folder, years=20, stations=1000, missing_rate=0.05, start_year=1986, seed=0):
+    """
+    Write one stations_group_<year>.csv per year into `folder`, each with one
+    row per station. Temperatures follow a southern-hemisphere seasonal cycle
+    (warm Dec-Feb) around a per-station mean, plus noise. A `missing_rate`
+    share of the monthly cells is left out, half as "NaN" and half blank.
+    Returns the list of files written.
+    """
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    header = "STATION_NAME,STN_ID,LAT,LON," + ",".join(MONTH_NAMES) + "\n"
+    #Per-station climate: mean temperature, seasonal amplitude and location
+    climates = [(rng.uniform(10, 28), rng.uniform(3, 12), rng.uniform(-43, -10), rng.uniform(113, 153))
+                for _ in range(stations)]
+    seasonal = [math.cos(2 * math.pi * month / 12) for month in range(12)] #January warmest
+
+    files = []
+    for year in range(start_year, start_year + years):
+        filename = os.path.join(folder, f"stations_group_{year}.csv")
+        with open(filename, "w", encoding="utf-8") as out:
+            out.write(header)
+            for number, (mean, amplitude, lat, lon) in enumerate(climates):
+                cells = []
+                for month in range(12):
+                    r = rng.random()
+                    if r < missing_rate:
+                        cells.append("NaN" if r < missing_rate / 2 else "")
+                    else:
+                        cells.append(f"{mean + amplitude * seasonal[month] + rng.gauss(0, 2):.1f}")
+                out.write(f"STATION {number},{10000 + number},{lat:.4f},{lon:.4f}," + ",".join(cells) + "\n")
+        files.append(filename)
+    return files
+
+
+def _peak_rss_mb():
+    #Peak resident set size of this process in MB, or None where unsupported
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_phase(phase, folder, output_dir):
+    #Runs inside a fresh process: (seconds, peak RSS in MB)
+    csv_files = Question2.find_csv_files(folder)
+    start = time.perf_counter()
+    if phase == "parse":
+        #Cold run: parse every CSV and write the binary cache
+        for filename in csv_files:
+            Question2.load_csv_cached(filename)
+    elif phase == "analyse":
+        #Warm run: every report from the cache
+        with contextlib.redirect_stdout(io.StringIO()):
+            Question2.write_reports(Question2.analyse(folder, verbose=False), output_dir)
+    elif phase == "stream":
+        #Row-by-row streaming without the cache
+        Question2.aggregate_files(csv_files, use_cache=False, verbose=False)
+    elif phase == "query":
+        index = Question2.TemperatureIndex(csv_files)
+        index.top_stations(20)
+    return time.perf_counter() - start, _peak_rss_mb()
+
+
+PHASES = ("parse", "analyse", "stream", "query")
+
+
+def run_benchmark(scales=DEFAULT_SCALES, missing_rate=0.05, phases=PHASES, workdir=None):
+    """
+    Generate an archive for every row count in `scales` and time each phase
+    on it in a fresh process. Returns a list of result dictionaries.
+    """
+    results = []
+    context = multiprocessing.get_context("spawn")
+    print(f"{'rows':>10}{'phase':>10}{'seconds':>10}{'rows/s':>14}{'peak MB':>10}")
+    for rows in scales:
+        rows = int(rows)
+        years = 20 if rows >= 20000 else 10
+        stations = max(1, rows // years)
+        folder = tempfile.mkdtemp(prefix="temperatures_", dir=workdir)
+        try:
+            generate_archive(folder, years=years, stations=stations, missing_rate=missing_rate)
+            for phase in phases:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    seconds, peak = pool.submit(_run_phase, phase, folder, folder).result()
+                results.append({"rows": years * stations, "years": years, "stations": stations,
+                                "phase": phase, "seconds": seconds, "peak_rss_mb": peak})
+                peak_text = f"{peak:.1f}" if peak is not None else "n/a"
+                print(f"{years * stations:>10}{phase:>10}{seconds:>10.3f}"
+                      f"{years * stations / seconds:>14,.0f}{peak_text:>10}")
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic temperature archives or benchmark Question2.")
+    sub = parser.add_subparsers(dest="command")
+
+    generate = sub.add_parser("generate", help="write a synthetic temperatures folder")
+    generate.add_argument("folder", nargs="?", default=Question2.DEFAULT_FOLDER)
+    generate.add_argument("--years", type=int, default=20)
+    generate.add_argument("--stations", type=int, default=1000)
+    generate.add_argument("--missing-rate", type=float, default=0.05)
+    generate.add_argument("--start-year", type=int, default=1986)
+    generate.add_argument("--seed", type=int, default=0)
+
+    parser.add_argument("--max-rows", type=float, default=1e6,
+                        help="largest archive to benchmark, in rows (default: 1e6, up to 1e7)")
+    parser.add_argument("--missing-rate", type=float, default=0.05)
+    parser.add_argument("--phases", nargs="+", choices=PHASES, default=list(PHASES))
+    parser.add_argument("--workdir", help="where to generate the archives (default: system temp folder)")
+    parser.add_argument("--json", metavar="PATH", help="also save the results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "generate":
+        files = generate_archive(args.folder, args.years, args.stations, args.missing_rate,
+                                 args.start_year, args.seed)
+        print(f"Wrote {len(files)} files with {args.stations} stations each to {args.folder}")
+        return
+
+    scales = [rows for rows in DEFAULT_SCALES if rows <= args.max_rows]
+    results = run_benchmark(scales, args.missing_rate, args.phases, args.workdir)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as out:
+            json.dump(results, out, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,88 +1,325 @@
-import turtle
-
-# Recommended ranges to avoid very slow or broken drawings
-RECOMMENDED_SIDES = (3, 12)
-RECOMMENDED_LENGTH = (50, 500)
-RECOMMENDED_DEPTH = (0, 6)
-
-def draw_koch_edge(t, length, depth):
-    """Draw one edge of the Koch pattern recursively."""
-    if depth == 0:
-        t.forward(length)
-        return
-    
-    segment = length / 3
-    draw_koch_edge(t, segment, depth - 1)
-    t.right(60)
-    draw_koch_edge(t, segment, depth - 1)
-    t.left(120)
-    draw_koch_edge(t, segment, depth - 1)
-    t.right(60)
-    draw_koch_edge(t, segment, depth - 1)
-
-def draw_polygon(t, sides, length, depth):
-    """Draw the starting polygon and apply the Koch pattern to each side."""
-    angle = 360 / sides
-    for _ in range(sides):
-        draw_koch_edge(t, length, depth)
-        t.right(angle)
-
-def get_input(prompt, cast_func, name, safe_range, min_allowed):
-    """
-    Get user input with basic validation.
-    If the value is outside the recommended range, warn once
-    and allow the user to re-enter. If still outside, proceed anyway.
-    """
-    while True:
-        try:
-            value = cast_func(input(prompt))
-            if value < min_allowed:
-                print(f"{name} must be at least {min_allowed}. Try again.")
-                continue
-
-            low, high = safe_range
-            if value < low or value > high:
-                print(f"Warning: {name} = {value} is outside the recommended range "
-                      f"({low}–{high}).")
-                retry = cast_func(input(f"Re-enter {name}: "))
-                if retry < min_allowed:
-                    print(f"{name} must be at least {min_allowed}. Using {value} 😊")
-                    return value
-                if retry < low or retry > high:
-                    print(f"Proceeding with {retry} 😊")
-                return retry
-            return value
-        except ValueError:
-            print("Invalid input. Please enter a number.")
-
-def main():
-    # Collect parameters from the user
-    sides = get_input("Enter the number of sides of the polygon (>=3): ",
-                      int, "Number of sides", RECOMMENDED_SIDES, 3)
-    length = get_input("Enter the length of each side (positive number): ",
-                       float, "Side length", RECOMMENDED_LENGTH, 1)
-    depth = get_input("Enter the recursion depth (>=0): ",
-                      int, "Recursion depth", RECOMMENDED_DEPTH, 0)
-
-    # Set up turtle screen
-    screen = turtle.Screen()
-    screen.bgcolor("white")
-    screen.tracer(0)  # Disable animation for faster drawing
-
-    t = turtle.Turtle()
-    t.speed(0)
-    t.hideturtle()
-
-    # Move to a better starting position
-    t.penup()
-    t.goto(-length / 2, -length / 2)
-    t.pendown()
-
-    # Draw the polygon with fractal edges
-    draw_polygon(t, sides, length, depth)
-
-    screen.update()
-    turtle.done()
-
-if __name__ == "__main__":
-    main()
+import argparse
+import itertools
+import math
+import struct
+import zlib
+
+import numpy as np
+
+# Recommended ranges to avoid very slow or broken drawings
+RECOMMENDED_SIDES = (3, 12)
+RECOMMENDED_LENGTH = (50, 500)
+RECOMMENDED_DEPTH = (0, 6)
+
+def draw_koch_edge(t, length, depth):
+    """Draw one edge of the Koch pattern recursively."""
+    if depth == 0:
+        t.forward(length)
+        return
+    
+    segment = length / 3
+    draw_koch_edge(t, segment, depth - 1)
+    t.right(60)
+    draw_koch_edge(t, segment, depth - 1)
+    t.left(120)
+    draw_koch_edge(t, segment, depth - 1)
+    t.right(60)
+    draw_koch_edge(t, segment, depth - 1)
+
+def draw_polygon(t, sides, length, depth):
+    """Draw the starting polygon and apply the Koch pattern to each side."""
+    angle = 360 / sides
+    for _ in range(sides):
+        draw_koch_edge(t, length, depth)
+        t.right(angle)
+
+def iter_koch_segments(sides, length, depth, start=(0.0, 0.0)):
+    """
+    Yield the Koch polygon's segments ((x0, y0), (x1, y1)) lazily, in the
+    order draw_polygon draws them.
+
+    Uses an explicit stack instead of recursion. The stack never holds more
+    than 7 items per level, so memory is O(depth) however many segments
+    there are, and the first segment is produced immediately.
+    """
+    x, y = start
+    heading = 0.0
+    # Work items: (length, depth) draws an edge, (None, degrees) turns left
+    for _ in range(sides):
+        stack = [(length, depth)]
+        while stack:
+            size, level = stack.pop()
+            if size is None:
+                heading += level
+            elif level == 0:
+                radians = math.radians(heading)
+                end_x, end_y = x + size * math.cos(radians), y + size * math.sin(radians)
+                yield (x, y), (end_x, end_y)
+                x, y = end_x, end_y
+            else:
+                third, level = size / 3, level - 1
+                # edge, right 60, edge, left 120, edge, right 60, edge (the same reversed)
+                stack.extend(((third, level), (None, -60), (third, level), (None, 120),
+                              (third, level), (None, -60), (third, level)))
+        heading -= 360 / sides
+
+def iter_koch_points(sides, length, depth, start=(0.0, 0.0)):
+    """Yield the path's vertices one by one (the start, then every segment end)."""
+    yield start
+    for _, end in iter_koch_segments(sides, length, depth, start):
+        yield end
+
+def count_segments(segments):
+    """Count the segments of a stream without keeping any of them."""
+    return sum(1 for _ in segments)
+
+def draw_segments(t, segments):
+    """Draw a stream of segments with the turtle as they arrive."""
+    for index, (begin, end) in enumerate(segments):
+        if index == 0:
+            t.penup()
+            t.goto(*begin)
+            t.pendown()
+        t.goto(*end)
+
+def koch_bounds(sides, length, depth, start=(0.0, 0.0), coarse_depth=4):
+    """
+    Bounding box ((min_x, min_y), (max_x, max_y)) of the Koch polygon, found
+    without generating every segment: the curve over a segment of length L
+    stays within L * sqrt(3) / 6 of it, so the bounds of a coarse level padded
+    by that distance contain all finer levels.
+    """
+    level = min(depth, coarse_depth)
+    points = koch_polygon_points(sides, length, level, start)
+    pad = 0.0 if level == depth else (length / 3 ** level) * math.sqrt(3) / 6
+    return points.min(axis=0) - pad, points.max(axis=0) + pad
+
+def koch_polygon_points(sides, length, depth, start=(0.0, 0.0)):
+    """
+    Compute the vertices of the Koch polygon without drawing anything.
+
+    Returns a float array of shape (sides * 4**depth + 1, 2): the path the
+    turtle would trace, starting at `start` heading east, with the last point
+    closing the polygon. Each level replaces every segment p -> q by the four
+    Koch segments in one vectorised step.
+    """
+    # Corners of the starting polygon, turning right by the exterior angle
+    headings = -np.arange(sides) * (2 * math.pi / sides)
+    steps = length * np.column_stack((np.cos(headings), np.sin(headings)))
+    points = np.vstack(([start], start + np.cumsum(steps, axis=0)))
+
+    # Rotation by -60 degrees (a right turn) for the tip of each bump
+    cos60, sin60 = 0.5, math.sqrt(3) / 2
+    rotate = np.array([[cos60, -sin60], [sin60, cos60]])
+
+    for _ in range(depth):
+        starts = points[:-1]
+        third = (points[1:] - starts) / 3
+        refined = np.empty((4 * len(starts) + 1, 2))
+        refined[0:-1:4] = starts
+        refined[1::4] = starts + third
+        refined[2::4] = starts + third + third @ rotate
+        refined[3::4] = starts + 2 * third
+        refined[-1] = points[-1]
+        points = refined
+    return points
+
+def draw_points(t, points):
+    """Trace a vertex array with one goto per point."""
+    t.penup()
+    t.goto(*points[0])
+    t.pendown()
+    for x, y in points[1:].tolist():
+        t.goto(x, y)
+
+def write_svg(points, path, stroke="black", stroke_width=1.0, margin=10.0, chunk_size=50000,
+              bounds=None):
+    """
+    Write the vertices as an SVG polyline path. `points` is a vertex array,
+    or any iterable of (x, y) pairs when `bounds` ((min_x, min_y),
+    (max_x, max_y)) is given, e.g. iter_koch_points with koch_bounds.
+    The path data is formatted and written in chunks, so the whole document
+    never has to be built as one string.
+    """
+    if bounds is None:
+        points = np.asarray(points)
+        bounds = points.min(axis=0), points.max(axis=0)
+    low = np.asarray(bounds[0]) - margin
+    width, height = np.asarray(bounds[1]) + margin - low
+    points = iter(points)
+    with open(path, "w", encoding="utf-8") as out:
+        out.write('<svg xmlns="http://www.w3.org/2000/svg" '
+                  f'viewBox="0 0 {width:.2f} {height:.2f}" width="{width:.0f}" height="{height:.0f}">\n')
+        out.write(f'<path fill="none" stroke="{stroke}" stroke-width="{stroke_width}" '
+                  'stroke-linejoin="round" d="M')
+        while True:
+            block = np.array(list(itertools.islice(points, chunk_size)), dtype=float).reshape(-1, 2)
+            if len(block) == 0:
+                break
+            block -= low
+            block[:, 1] = height - block[:, 1]  # SVG y grows downwards
+            out.write(" ".join(f"{x:.2f},{y:.2f}" for x, y in block.tolist()))
+            out.write(" ")
+        out.write('"/>\n</svg>\n')
+
+def rasterize(points, size=1024, margin=10, supersample=4, line_width=1.0, batch=1 << 20):
+    """
+    Draw the vertex array into a grayscale uint8 image (black lines on white)
+    whose longer side is `size` pixels. Lines are drawn into a canvas
+    `supersample` times larger and averaged down, which anti-aliases them.
+    """
+    low = points.min(axis=0)
+    extent = max((points.max(axis=0) - low).max(), 1e-9)
+    scale = (size - 2 * margin) / extent
+    width, height = np.ceil((points.max(axis=0) - low) * scale).astype(int) + 2 * margin
+    hi_w, hi_h = width * supersample, height * supersample
+    canvas = np.zeros((hi_h, hi_w), dtype=bool)
+
+    # Canvas coordinates, with y flipped so the image is upright
+    xy = (points - low) * scale * supersample + margin * supersample
+    xy[:, 1] = hi_h - 1 - xy[:, 1]
+    starts, deltas = xy[:-1], np.diff(xy, axis=0)
+    # Sample every segment at least twice per canvas pixel
+    samples = np.maximum(np.ceil(np.hypot(deltas[:, 0], deltas[:, 1]) * 2).astype(np.int64), 1)
+
+    first = 0
+    while first < len(starts):
+        # Take as many segments as fit in one batch of samples
+        last = first + max(1, int(np.searchsorted(np.cumsum(samples[first:]), batch)))
+        counts = samples[first:last]
+        segment = np.repeat(np.arange(first, last), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        t = (offsets / np.repeat(counts, counts))[:, None]
+        pixels = np.rint(starts[segment] + t * deltas[segment]).astype(np.int64)
+        np.clip(pixels[:, 0], 0, hi_w - 1, out=pixels[:, 0])
+        np.clip(pixels[:, 1], 0, hi_h - 1, out=pixels[:, 1])
+        canvas[pixels[:, 1], pixels[:, 0]] = True
+        first = last
+    canvas[int(np.clip(xy[-1, 1], 0, hi_h - 1)), int(np.clip(xy[-1, 0], 0, hi_w - 1))] = True
+
+    # Thicken the lines to line_width output pixels
+    radius = max(int(round(line_width * supersample / 2)), 0)
+    if radius:
+        thick = canvas.copy()
+        for dy in range(-radius, radius + 1):
+            for dx in range(-radius, radius + 1):
+                if dx * dx + dy * dy <= radius * radius:
+                    thick |= np.roll(np.roll(canvas, dy, axis=0), dx, axis=1)
+        canvas = thick
+
+    coverage = canvas.reshape(height, supersample, width, supersample).mean(axis=(1, 3))
+    return np.rint(255 * (1 - coverage)).astype(np.uint8)
+
+def write_png(image, path):
+    """Write a grayscale uint8 array as a PNG file using only zlib."""
+    height, width = image.shape
+    raw = np.hstack((np.zeros((height, 1), dtype=np.uint8), image)).tobytes()  # filter byte 0 per row
+
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    with open(path, "wb") as out:
+        out.write(b"\x89PNG\r\n\x1a\n")
+        out.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)))
+        out.write(chunk(b"IDAT", zlib.compress(raw, 6)))
+        out.write(chunk(b"IEND", b""))
+
+def export(sides, length, depth, svg_path=None, png_path=None, size=1024, stream=False):
+    """
+    Write the requested SVG and/or PNG files. By default the vertex array is
+    computed once for both; with `stream=True` the SVG is written straight
+    from iter_koch_points in constant memory (PNG export needs the array).
+    """
+    if stream and svg_path:
+        write_svg(iter_koch_points(sides, length, depth), svg_path,
+                  bounds=koch_bounds(sides, length, depth))
+        svg_path = None
+    if svg_path or png_path:
+        points = koch_polygon_points(sides, length, depth)
+        if svg_path:
+            write_svg(points, svg_path)
+        if png_path:
+            write_png(rasterize(points, size=size), png_path)
+
+def get_input(prompt, cast_func, name, safe_range, min_allowed):
+    """
+    Get user input with basic validation.
+    If the value is outside the recommended range, warn once
+    and allow the user to re-enter. If still outside, proceed anyway.
+    """
+    while True:
+        try:
+            value = cast_func(input(prompt))
+            if value < min_allowed:
+                print(f"{name} must be at least {min_allowed}. Try again.")
+                continue
+
+            low, high = safe_range
+            if value < low or value > high:
+                print(f"Warning: {name} = {value} is outside the recommended range "
+                      f"({low}–{high}).")
+                retry = cast_func(input(f"Re-enter {name}: "))
+                if retry < min_allowed:
+                    print(f"{name} must be at least {min_allowed}. Using {value} 😊")
+                    return value
+                if retry < low or retry > high:
+                    print(f"Proceeding with {retry} 😊")
+                return retry
+            return value
+        except ValueError:
+            print("Invalid input. Please enter a number.")
+
+def main():
+    # Collect parameters from the user
+    sides = get_input("Enter the number of sides of the polygon (>=3): ",
+                      int, "Number of sides", RECOMMENDED_SIDES, 3)
+    length = get_input("Enter the length of each side (positive number): ",
+                       float, "Side length", RECOMMENDED_LENGTH, 1)
+    depth = get_input("Enter the recursion depth (>=0): ",
+                      int, "Recursion depth", RECOMMENDED_DEPTH, 0)
+
+    import turtle  # Only the interactive window needs Tk
+
+    # Set up turtle screen
+    screen = turtle.Screen()
+    screen.bgcolor("white")
+    screen.tracer(0)  # Disable animation for faster drawing
+
+    t = turtle.Turtle()
+    t.speed(0)
+    t.hideturtle()
+
+    # Compute the polygon with fractal edges from a better starting position, then draw it
+    points = koch_polygon_points(sides, length, depth, start=(-length / 2, -length / 2))
+    draw_points(t, points)
+
+    screen.update()
+    turtle.done()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Draw a Koch polygon, or export it to SVG/PNG without a display.")
+    parser.add_argument("--sides", type=int, default=3, help="number of sides (>=3)")
+    parser.add_argument("--length", type=float, default=300, help="side length")
+    parser.add_argument("--depth", type=int, default=4, help="recursion depth (>=0)")
+    parser.add_argument("--svg", metavar="PATH", help="write an SVG file")
+    parser.add_argument("--png", metavar="PATH", help="write an anti-aliased PNG file")
+    parser.add_argument("--size", type=int, default=1024, help="PNG size in pixels (longer side)")
+    parser.add_argument("--stream", action="store_true",
+                        help="write the SVG from the segment generator in constant memory")
+    parser.add_argument("--count", action="store_true",
+                        help="count the segments by streaming them and exit")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.svg or args.png or args.count:
+        if args.sides < 3 or args.length < 1 or args.depth < 0:
+            raise SystemExit("Need sides >= 3, length >= 1 and depth >= 0.")
+        if args.count:
+            print(count_segments(iter_koch_segments(args.sides, args.length, args.depth)))
+        else:
+            export(args.sides, args.length, args.depth, args.svg, args.png, args.size, args.stream)
+    else:
+        main()
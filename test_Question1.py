@@ -0,0 +1,100 @@
+import os
+import random
+import string
+import subprocess
+import sys
+
+import pytest
+
+import Question1
+
+TEXT = string.printable + "Ünïcödé text, ß and 漢字.\n" + string.ascii_letters * 3
+SHIFT_PAIRS = [(a, b) for a in range(-30, 31, 7) for b in range(-30, 31, 5)]
+SHIFT_PAIRS += [(0, 0), (1000, 7), (-999, 12345), (26, 26), (52, -78)]
+SEEDS = [0, 1, 42]
+
+
+@pytest.mark.parametrize("shift1, shift2", SHIFT_PAIRS)
+def test_encrypt_backends_agree(shift1, shift2):
+    expected = Question1.encrypt_text(TEXT, shift1, shift2, backend="reference")
+    assert Question1.encrypt_text(TEXT, shift1, shift2) == expected
+    assert Question1.encrypt_bytes(TEXT.encode(), shift1, shift2) == expected.encode()
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("shift1, shift2", SHIFT_PAIRS)
+def test_decrypt_backends_agree(shift1, shift2, seed):
+    encrypted = Question1.encrypt_text(TEXT, shift1, shift2)
+    random.seed(seed)
+    expected = Question1.decrypt_text(encrypted, shift1, shift2, backend="reference")
+    random.seed(seed)
+    assert Question1.decrypt_text(encrypted, shift1, shift2) == expected
+
+
+@pytest.mark.parametrize("shift1, shift2", SHIFT_PAIRS)
+def test_round_trip_without_collisions(shift1, shift2):
+    encrypted = Question1.encrypt_text(TEXT, shift1, shift2)
+    decrypted, collisions = Question1.decrypt_text(encrypted, shift1, shift2)
+    if collisions == 0:
+        assert decrypted == TEXT
+
+
+def test_check_backends_covers_default_pairs():
+    assert Question1.check_backends() == 61 * 61 + 4
+
+
+def test_check_backends_raises_on_mismatch(monkeypatch):
+    monkeypatch.setattr(Question1, "encrypt_text_reference", lambda text, shift1, shift2: text.upper())
+    with pytest.raises(AssertionError, match="encrypt mismatch"):
+        Question1.check_backends([(3, 4)])
+
+
+def test_check_backends_raises_under_optimize():
+    # Bare asserts are stripped by `python -O`; the check must still fail loudly
+    code = ("import Question1\n"
+            "Question1.encrypt_text_reference = lambda text, shift1, shift2: text.upper()\n"
+            "Question1.check_backends([(3, 4)])\n")
+    result = subprocess.run([sys.executable, "-O", "-c", code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.returncode != 0
+    assert "encrypt mismatch" in result.stderr
+
+
+def test_numpy_positions_are_opt_in(tmp_path):
+    encrypted = tmp_path / "encrypted.txt"
+    encrypted.write_text(Question1.encrypt_text(TEXT * 50, 3, 4))
+    counted = Question1.decrypt_file_numpy(3, 4, str(encrypted), str(tmp_path / "a.txt"), seed=1)
+    collected = Question1.decrypt_file_numpy(3, 4, str(encrypted), str(tmp_path / "b.txt"), seed=1,
+                                             collect_positions=True)
+    assert counted.positions is None and counted.chosen is None
+    assert counted.collision_count == collected.collision_count == collected.positions.size > 0
+    assert (tmp_path / "a.txt").read_bytes() == (tmp_path / "b.txt").read_bytes()
+
+
+def test_numpy_rejects_unknown_policy_without_collisions(tmp_path):
+    (tmp_path / "empty.txt").write_bytes(b"")
+    with pytest.raises(ValueError, match="Unknown collision policy"):
+        Question1.decrypt_file_numpy(3, 4, str(tmp_path / "empty.txt"), str(tmp_path / "out.txt"), policy="nope")
+
+
+def test_incomplete_resolver_fails_at_construction():
+    class Incomplete(Question1.CollisionResolver):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.parametrize("offset", range(0, 12))
+def test_excerpt_never_splits_multibyte_characters(tmp_path, offset):
+    path = tmp_path / "text.txt"
+    path.write_text("漢字ß" * 4, encoding="utf-8")
+    assert "�" not in Question1._excerpt(str(path), offset, width=4)
+
+
+def test_verify_reports_bytes(tmp_path, capsys):
+    (tmp_path / "a.txt").write_text("abc漢字", encoding="utf-8")
+    (tmp_path / "b.txt").write_text("abc漢子", encoding="utf-8")
+    assert not Question1.verify_files(str(tmp_path / "a.txt"), str(tmp_path / "b.txt"))
+    out = capsys.readouterr().out
+    assert "mismatched bytes" in out and "byte offset 8" in out
@@ -0,0 +1,108 @@
+import math
+import os
+import random
+
+import numpy as np
+import pytest
+
+import Question2
+from Question2 import RunningStats
+from Question2_benchmark import generate_archive
+
+
+def assert_stats_close(actual, expected):
+    assert actual.count == expected.count
+    assert actual.min == expected.min and actual.max == expected.max
+    assert actual.mean == pytest.approx(expected.mean, rel=1e-12, abs=1e-12)
+    assert actual.m2 == pytest.approx(expected.m2, rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize("shards", [1, 2, 3, 7, 50])
+def test_merged_shards_equal_one_pass(shards):
+    rng = random.Random(shards)
+    values = [rng.gauss(20, 8) for _ in range(1000)]
+    one_pass = RunningStats.from_values(values)
+
+    pushed = RunningStats()
+    for value in values:
+        pushed.push(value)
+    assert_stats_close(pushed, one_pass)
+
+    merged = RunningStats()
+    for shard in np.array_split(np.array(values), shards):
+        merged.merge(RunningStats.from_values(shard))
+    assert_stats_close(merged, one_pass)
+    assert merged.std == pytest.approx(float(np.std(values)))
+
+
+def test_empty_merges():
+    stats = RunningStats.from_values([1.0, 2.0, 4.0])
+    before = stats.to_list()
+    assert stats.merge(RunningStats()).to_list() == before
+    assert RunningStats().merge(stats).to_list() == before
+    empty = RunningStats().merge(RunningStats())
+    assert empty.count == 0 and math.isnan(empty.std)
+    assert RunningStats.from_values([]).to_list() == RunningStats().to_list()
+
+
+def assert_reports_close(actual, expected):
+    #Streamed rows and cached arrays hold the same float32 readings but are summed in a different order
+    if isinstance(expected, dict):
+        assert actual.keys() == expected.keys()
+        for key in expected:
+            assert_reports_close(actual[key], expected[key])
+    elif isinstance(expected, (tuple, list)):
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            assert_reports_close(a, e)
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected, rel=1e-12)
+    else:
+        assert actual == expected
+
+
+def test_cached_reports_match_uncached(tmp_path):
+    folder = tmp_path / "temperatures"
+    generate_archive(str(folder), years=3, stations=40, seed=1)
+    uncached = Question2.analyse(str(folder), use_cache=False, verbose=False)
+    filled = Question2.analyse(str(folder), use_cache=True, verbose=False)
+    cached = Question2.analyse(str(folder), use_cache=True, verbose=False)
+    assert cached == filled
+    assert_reports_close(cached, uncached)
+    assert uncached["overall"][1:] == cached["overall"][1:] #Max and min are exact
+
+
+def test_append_matches_full_run(tmp_path):
+    folder = tmp_path / "temperatures"
+    *first, last = generate_archive(str(folder), years=4, stations=30, seed=2)
+    held_back = tmp_path / "held_back.csv"
+    os.replace(last, held_back)
+    state = str(tmp_path / "state.json")
+    Question2.analyse(str(folder), verbose=False, state_path=state)
+
+    os.replace(held_back, last)
+    appended = Question2.append(str(folder), state, verbose=False)
+    assert_reports_close(appended, Question2.analyse(str(folder), verbose=False))
+    assert Question2.append(str(folder), state, verbose=False) == appended #Nothing new: state unchanged
+
+
+def test_append_skips_changed_files(tmp_path, capsys):
+    folder = tmp_path / "temperatures"
+    files = generate_archive(str(folder), years=2, stations=10, seed=3)
+    state = str(tmp_path / "state.json")
+    before = Question2.analyse(str(folder), verbose=False, state_path=state)
+    with open(files[0], "a", encoding="utf-8") as f:
+        f.write("STATION X,99999,-30.0,140.0," + ",".join(["50.0"] * 12) + "\n")
+    assert Question2.append(str(folder), state, verbose=False) == before
+    assert "Changed since it was added" in capsys.readouterr().out
+
+
+def test_state_is_saved_in_output_dir(tmp_path, monkeypatch):
+    folder = tmp_path / "temperatures"
+    generate_archive(str(folder), years=1, stations=5, seed=4)
+    output_dir = tmp_path / "reports"
+    output_dir.mkdir()
+    monkeypatch.chdir(tmp_path)
+    Question2.main([str(folder), "--output-dir", str(output_dir), "--quiet"])
+    assert (output_dir / Question2.STATE_FILE_NAME).exists()
+    assert not (tmp_path / Question2.STATE_FILE_NAME).exists()
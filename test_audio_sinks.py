@@ -0,0 +1,35 @@
+import io
+import os
+import sys
+import wave
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "HIT_137_Assignment3_files"))
+
+from audio_sinks import AudioSink, MemoryWavSink, NullSink
+
+
+def test_incomplete_sink_fails_at_construction():
+    class Incomplete(AudioSink):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_sinks_count_frames():
+    audio = np.linspace(-1, 1, 2400, dtype=np.float32)
+    with NullSink() as sink:
+        sink.write(audio, 24000)
+        sink.write(audio, 24000)
+    assert sink.frames == 4800 and sink.duration == pytest.approx(0.2)
+
+
+def test_memory_wav_sink_writes_every_chunk():
+    with MemoryWavSink() as sink:
+        sink.write(np.zeros(100, dtype=np.float32), 16000)
+        sink.write(np.ones(50, dtype=np.int16), 16000)
+    with wave.open(io.BytesIO(sink.getvalue())) as wav:
+        assert wav.getnframes() == 150 and wav.getframerate() == 16000
@@ -0,0 +1,79 @@
+import csv
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "HIT_137_Assignment3_files"))
+
+pytest.importorskip("PIL")
+import batch_caption
+
+IMAGES = [f"{n}.jpg" for n in range(10)]
+
+
+class StandInRunner:
+    def __init__(self, fail_on_call=None):
+        self.calls = 0
+        self.fail_on_call = fail_on_call
+        self.captioned = []
+
+    def run_image_captioning_batch(self, images, batch_size):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise KeyboardInterrupt
+        self.captioned += images
+        return [f"caption of {os.path.basename(image)}" for image in images]
+
+
+@pytest.fixture
+def folder(tmp_path, monkeypatch):
+    images = tmp_path / "images"
+    images.mkdir()
+    for name in IMAGES:
+        (images / name).write_bytes(b"")
+    monkeypatch.setattr(batch_caption, "load_image", lambda path, max_size: path)
+    return str(images)
+
+
+def read_rows(output):
+    with open(output, newline="", encoding="utf-8") as f:
+        if output.endswith(".csv"):
+            return list(csv.DictReader(f))
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.parametrize("name, partial", [("out.jsonl", '{"path": "trunc'), ("out.csv", "7.jpg,a half-writ")])
+def test_resume_after_interrupted_run(folder, tmp_path, name, partial):
+    output = str(tmp_path / name)
+    with pytest.raises(KeyboardInterrupt):
+        batch_caption.caption_folder(folder, output, batch_size=3, workers=1,
+                                     runner=StandInRunner(fail_on_call=3))
+    with open(output, "a", newline="", encoding="utf-8") as f:
+        f.write(partial)  # Killed in the middle of writing a row
+    assert len(batch_caption.load_done(output)) == 6
+
+    runner = StandInRunner()
+    batch_caption.caption_folder(folder, output, batch_size=3, workers=1, runner=runner)
+    assert [os.path.basename(path) for path in runner.captioned] == IMAGES[6:]
+    rows = read_rows(output)
+    assert sorted(row["path"] for row in rows) == sorted(IMAGES)
+    assert all(row["caption"] == f"caption of {row['path']}" for row in rows)
+
+    again = StandInRunner()
+    batch_caption.caption_folder(folder, output, batch_size=3, workers=1, runner=again)
+    assert again.calls == 0
+
+
+def test_csv_rows_missing_fields_are_not_done(tmp_path):
+    output = tmp_path / "out.csv"
+    output.write_bytes(b"path,caption,error\r\n1.jpg,a cat,\r\n2.jpg,a d\r\n")
+    assert batch_caption.load_done(str(output)) == {"1.jpg"}
+
+
+def test_partial_row_inside_quoted_field_is_dropped(tmp_path):
+    output = tmp_path / "out.csv"
+    output.write_bytes(b'path,caption,error\r\n1.jpg,a cat,\r\n2.jpg,,"line one\r\nline')
+    batch_caption.trim_partial_row(str(output), is_csv=True)
+    assert output.read_bytes() == b"path,caption,error\r\n1.jpg,a cat,\r\n"
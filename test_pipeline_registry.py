@@ -0,0 +1,95 @@
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "HIT_137_Assignment3_files"))
+
+from inference_profile import InferenceProfile
+from pipeline_registry import PipelineRegistry
+
+SIZES = {"small-a": 40, "small-b": 40, "small-c": 40, "large": 150}
+
+
+class CountingFactory:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, task, model):
+        with self.lock:
+            self.calls.append(model)
+        time.sleep(self.delay)
+        return SimpleNamespace(task=task, model_id=model, size_mb=SIZES.get(model, 1))
+
+
+def make_registry(factory=None, budget=100):
+    return PipelineRegistry(factory=factory or CountingFactory(), memory_budget_mb=budget,
+                            size_estimator=lambda pipe: pipe.size_mb, profile=InferenceProfile())
+
+
+def models(registry):
+    return [model for _, model in registry.loaded()]
+
+
+def test_concurrent_get_loads_once():
+    factory = CountingFactory(delay=0.05)
+    registry = make_registry(factory)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(registry.get("image-to-text", "small-a"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert factory.calls == ["small-a"]
+    assert len(results) == 8 and all(pipe is results[0] for pipe in results)
+
+
+def test_lru_eviction_over_budget():
+    registry = make_registry()
+    registry.get("task", "small-a")
+    registry.get("task", "small-b")
+    registry.get("task", "small-a")  # small-b is now least recently used
+    assert models(registry) == ["small-b", "small-a"]
+    registry.get("task", "small-c")  # 120 MB > 100 MB: drops small-b
+    assert models(registry) == ["small-a", "small-c"]
+    assert registry.memory_used_mb() == 80
+
+
+def test_just_loaded_model_is_never_evicted():
+    registry = make_registry()
+    registry.get("task", "small-a")
+    pipe = registry.get("task", "large")  # Over budget on its own
+    assert models(registry) == ["large"]
+    assert registry.get("task", "large") is pipe
+
+
+def test_register_factory_overrides_default():
+    default, override = CountingFactory(), CountingFactory()
+    registry = make_registry(default)
+    registry.register_factory("task", "small-a", override)
+    registry.get("task", "small-a")
+    registry.get("task", "small-b")
+    assert override.calls == ["small-a"] and default.calls == ["small-b"]
+
+
+def test_evict_and_clear():
+    factory = CountingFactory()
+    registry = make_registry(factory)
+    registry.get("task", "small-a")
+    registry.get("task", "small-b")
+    registry.evict("task", "small-a")
+    registry.evict("task", "missing")  # No-op
+    assert models(registry) == ["small-b"]
+    registry.get("task", "small-a")  # Loaded again after eviction
+    assert factory.calls == ["small-a", "small-b", "small-a"]
+    registry.clear()
+    assert registry.loaded() == [] and registry.memory_used_mb() == 0
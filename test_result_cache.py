@@ -0,0 +1,52 @@
+import os
+import sys
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "HIT_137_Assignment3_files"))
+
+from result_cache import ResultCache
+
+BUDGET_MB = 0.05
+
+
+def folder_bytes(folder):
+    return sum(entry.stat().st_size for entry in os.scandir(folder))
+
+
+def write_shared_keys(folder, writer):
+    cache = ResultCache(folder, max_mb=BUDGET_MB)
+    for i in range(100):
+        cache.put_caption(f"key{i % 5}", f"writer {writer} " + "x" * 1000)
+
+
+def test_writers_in_several_processes_share_a_folder(tmp_path):
+    folder = str(tmp_path)
+    processes = [get_context("spawn").Process(target=write_shared_keys, args=(folder, n)) for n in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert [process.exitcode for process in processes] == [0] * 4
+    assert not [name for name in os.listdir(folder) if name.endswith(".tmp")]
+    assert ResultCache(folder).get_caption("key0").startswith("writer ")
+
+
+def test_folder_is_only_scanned_when_over_budget(tmp_path):
+    cache = ResultCache(str(tmp_path), max_mb=BUDGET_MB)
+    scans = []
+    evict = cache.evict
+    cache.evict = lambda: scans.append(1) or evict()
+    for i in range(300):
+        cache.put_caption(f"key{i}", "y" * 1000)
+    assert folder_bytes(tmp_path) <= BUDGET_MB * 1024 * 1024
+    assert len(scans) < 300 // 4
+    assert cache.get_caption("key299") == "y" * 1000
+    assert cache.get_caption("key0") is None  # Least recently used entries went first
+
+
+def test_overwriting_an_entry_does_not_grow_the_total(tmp_path):
+    cache = ResultCache(str(tmp_path), max_mb=BUDGET_MB)
+    cache.put_caption("key", "a" * 100)
+    for _ in range(50):
+        cache.put_caption("key", "b" * 100)
+    assert cache._size == folder_bytes(tmp_path) == 100